@@ -34,6 +34,15 @@ from dotenv import load_dotenv
 import xlsxwriter
 from PIL import Image, ImageDraw, ImageFont
 from urllib.parse import quote
+from collections import OrderedDict
+import threading
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+import zipfile
+try:
+    import pyarrow  # Parquet 다운로드용 (없으면 Parquet 버튼만 숨김)
+except ImportError:
+    pyarrow = None
 
 # === ✅ 로고 파일 경로 ===
 FRONT_LOGO_URL = "assets/FRONTLOGO.png"
@@ -643,6 +652,12 @@ def check_file_modified(file_path):
         st.error(f"파일 수정 여부를 확인하는 중 오류가 발생했습니다: {str(e)}")
         return False
 
+def get_data_version(file_path="General/00_2. HRmate/임직원 기초 데이터.xlsx"):
+    """파일의 데이터 버전(마지막 수정 시각)을 반환하는 함수 - 사전계산 결과의 캐시 키로 사용"""
+    if f"{file_path}_modified_time" not in st.session_state:
+        st.session_state[f"{file_path}_modified_time"] = get_file_last_modified(file_path)
+    return st.session_state[f"{file_path}_modified_time"]
+
 def load_authorized_emails():
     """권한이 있는 이메일 목록을 로드하는 함수"""
     try:
@@ -763,12 +778,68 @@ def convert_date(date_value):
         return pd.NaT
 
 # 엑셀 다운로드 함수 캐싱
-def convert_df_to_excel(df):
+def convert_df_to_excel(df, sheet_name='임직원명부', column_widths=None):
+    """DataFrame을 xlsxwriter constant_memory 모드로 한 행씩 기록해 엑셀 바이트로 반환하는 함수
+
+    머리글은 pandas 기본 서식(굵게, 테두리, 가운데)과 같고, column_widths는 {'B': 10, ...} 형태의 열 너비
+    """
     output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='임직원명부')
-    processed_data = output.getvalue()
-    return processed_data
+    workbook = xlsxwriter.Workbook(output, {
+        'constant_memory': True,
+        'strings_to_urls': False,
+        'strings_to_formulas': False,
+        'nan_inf_to_errors': True,
+    })
+    worksheet = workbook.add_worksheet(sheet_name)
+    header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+    date_format = workbook.add_format({'num_format': 'yyyy-mm-dd'})
+    datetime_format = workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm:ss'})
+    time_format = workbook.add_format({'num_format': 'hh:mm:ss'})
+
+    for column, width in (column_widths or {}).items():
+        worksheet.set_column(f'{column}:{column}', width)
+    worksheet.write_row(0, 0, [str(col) for col in df.columns], header_format)
+
+    # 열마다 파이썬 값 목록으로 한 번에 변환 (결측값은 None -> 빈 셀)
+    columns = []
+    date_columns = []
+    for col_num, (_, series) in enumerate(df.items()):
+        values = series.astype(object).where(series.notna(), None).tolist()
+        columns.append(values)
+        if pd.api.types.is_datetime64_any_dtype(series):
+            date_columns.append((col_num, values, datetime_format))
+        elif series.dtype == object:
+            first = series.dropna().head(1).tolist()
+            if first and isinstance(first[0], date):
+                date_columns.append((col_num, values, date_format))
+            elif first and isinstance(first[0], time):
+                date_columns.append((col_num, values, time_format))
+
+    for row_num, row in enumerate(zip(*columns), start=1):
+        worksheet.write_row(row_num, 0, row)
+        # 날짜/시각 셀은 표시 형식을 지정해 다시 기록 (같은 행이므로 스트리밍 순서 유지)
+        for col_num, values, cell_format in date_columns:
+            value = values[row_num - 1]
+            if isinstance(value, (date, time)):
+                worksheet.write_datetime(row_num, col_num, value, cell_format)
+
+    workbook.close()
+    return output.getvalue()
+
+def convert_df_to_csv(df):
+    """DataFrame을 엑셀에서 한글이 깨지지 않도록 UTF-8(BOM) CSV 바이트로 반환하는 함수"""
+    return df.to_csv(index=False).encode('utf-8-sig')
+
+def convert_df_to_parquet(df):
+    """DataFrame을 Parquet 바이트로 반환하는 함수 - 숫자/문자가 섞인 object 열은 문자열로 맞춰 저장"""
+    df = df.copy()
+    df.columns = [str(col) for col in df.columns]
+    for col in df.columns[df.dtypes == object]:
+        if pd.api.types.infer_dtype(df[col], skipna=True).startswith('mixed'):
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    output = BytesIO()
+    df.to_parquet(output, index=False, engine='pyarrow')
+    return output.getvalue()
 
 # CSS 스타일 추가
 st.markdown("""
@@ -987,7 +1058,8 @@ def main():
                     search_name = st.text_input("성명으로 검색", key="contact_search")
 
                     if search_name:
-                        search_result = current_employees[current_employees['성명'].str.contains(search_name, na=False)]
+                        name_index = build_name_index(df['성명'], (get_data_version(), '임직원'))
+                        search_result = filter_by_name(current_employees, search_name, name_index)
                         if not search_result.empty:
                             result_df = search_result[['성명', '본부', '팀', '직위', 'E-Mail', '핸드폰']]
                             st.dataframe(result_df, hide_index=True)
@@ -1107,6 +1179,11 @@ def main():
         if '퇴사일' in df.columns:
             df['퇴사연도'] = df['퇴사일'].dt.year
         
+        # 근속월수/근속기간 구분 (데이터 버전별 1회 계산)
+        tenure_columns = build_tenure_columns(df, get_data_version())
+        df['근속월수'] = tenure_columns['근속월수']
+        df['근속기간_구분'] = tenure_columns['근속기간_구분']
+        
         if menu == "📊 인원현황":
             # 기본통계 분석
             st.markdown("##### 📊 인원현황")
@@ -1130,26 +1207,39 @@ def main():
                 unsafe_allow_html=True
             )
 
-            # 기준일자로 재직자 필터링
-            재직자 = len(df[
-                (df['입사일'].dt.date <= query_date) & 
-                ((df['퇴사일'].isna()) | (df['퇴사일'].dt.date >= query_date))
-            ])
-            
-            # 해당 연도의 입퇴사자 계산
-            selected_year = query_date.year
-            정규직_입사자 = len(df[(df['입사일'].dt.year == selected_year) & (df['고용구분'] == '정규직') & (df['입사일'].dt.date <= query_date)])
-            정규직_퇴사자 = len(df[(df['퇴사일'].dt.year == selected_year) & (df['고용구분'] == '정규직') & (df['퇴사일'].dt.date < query_date)])
-            계약직_입사자 = len(df[(df['입사일'].dt.year == selected_year) & (df['고용구분'] == '계약직') & (df['입사일'].dt.date <= query_date)])
-            계약직_퇴사자 = len(df[(df['퇴사일'].dt.year == selected_year) & (df['고용구분'] == '계약직') & (df['퇴사일'].dt.date < query_date)])
-            
-            # 퇴사율 계산 (소수점 첫째자리까지)
-            재직_정규직_수 = len(df[
-                (df['고용구분'] == '정규직') & 
-                (df['입사일'].dt.date <= query_date) & 
-                ((df['퇴사일'].isna()) | (df['퇴사일'].dt.date > query_date))
-            ])
-            퇴사율 = round((정규직_퇴사자 / 재직_정규직_수 * 100), 1) if 재직_정규직_수 > 0 else 0
+            def compute_summary():
+                # 기준일자로 재직자 필터링
+                재직자 = len(df[
+                    (df['입사일'].dt.date <= query_date) & 
+                    ((df['퇴사일'].isna()) | (df['퇴사일'].dt.date >= query_date))
+                ])
+            
+                # 해당 연도의 입퇴사자 계산
+                selected_year = query_date.year
+                정규직_입사자 = len(df[(df['입사일'].dt.year == selected_year) & (df['고용구분'] == '정규직') & (df['입사일'].dt.date <= query_date)])
+                정규직_퇴사자 = len(df[(df['퇴사일'].dt.year == selected_year) & (df['고용구분'] == '정규직') & (df['퇴사일'].dt.date < query_date)])
+                계약직_입사자 = len(df[(df['입사일'].dt.year == selected_year) & (df['고용구분'] == '계약직') & (df['입사일'].dt.date <= query_date)])
+                계약직_퇴사자 = len(df[(df['퇴사일'].dt.year == selected_year) & (df['고용구분'] == '계약직') & (df['퇴사일'].dt.date < query_date)])
+            
+                # 퇴사율 계산 (소수점 첫째자리까지)
+                재직_정규직_수 = len(df[
+                    (df['고용구분'] == '정규직') & 
+                    (df['입사일'].dt.date <= query_date) & 
+                    ((df['퇴사일'].isna()) | (df['퇴사일'].dt.date > query_date))
+                ])
+                퇴사율 = round((정규직_퇴사자 / 재직_정규직_수 * 100), 1) if 재직_정규직_수 > 0 else 0
+
+                # 현재 재직자 필터링 (조회 기준일 기준)
+                current_employees = df[
+                    (df['입사일'].dt.date <= query_date) & 
+                    ((df['퇴사일'].isna()) | (df['퇴사일'].dt.date >= query_date))
+                ]
+                return (재직자, 정규직_입사자, 정규직_퇴사자, 계약직_입사자, 계약직_퇴사자,
+                        재직_정규직_수, 퇴사율, current_employees)
+
+            # 조회 기준일이 바뀐 경우에만 다시 계산
+            (재직자, 정규직_입사자, 정규직_퇴사자, 계약직_입사자, 계약직_퇴사자,
+             재직_정규직_수, 퇴사율, current_employees) = get_section_result('인원현황_요약', get_data_version(), compute_summary)
             
             # 통계 표시
             st.markdown(
@@ -1201,121 +1291,151 @@ def main():
 
             st.markdown("<br>", unsafe_allow_html=True)
             
+            # 본부 → 실 → 팀 조직 트리 (데이터 버전별 1회 생성)
+            org_tree = build_org_tree(df, get_data_version())
+
             # 3개의 컬럼 생성 (0.4:0.4:0.2 비율)
             col1, col2, col3 = st.columns([0.4, 0.3, 0.3])
             
-            # 현재 재직자 필터링 (조회 기준일 기준)
-            current_employees = df[
-                (df['입사일'].dt.date <= query_date) & 
-                ((df['퇴사일'].isna()) | (df['퇴사일'].dt.date >= query_date))
-            ]
-            
             with col1:
-                # 본부별 인원 현황
-                dept_counts = current_employees['본부'].value_counts().reset_index()
-                dept_counts.columns = ['본부', '인원수']
+                def build_dept_chart():
+                    # 본부별 인원 현황 (조직 트리의 기준일 재직 인원)
+                    dept_counts = query_org_tree(org_tree, query_date)
+                    dept_counts = dept_counts[dept_counts['본부'] != '-']
+                    dept_counts = dept_counts[dept_counts['재직'] > 0].sort_values('재직', ascending=False, kind='stable')
+                    dept_counts = dept_counts[['본부', '재직']].rename(columns={'재직': '인원수'}).reset_index(drop=True)
                 
-                # 본부별 그래프 (수평 막대 그래프)
-                fig_dept = px.bar(
-                    dept_counts,
-                    y='본부',
-                    x='인원수',
-                    title="본부별",
-                    width=400,
-                    height=300,
-                    orientation='h'  # 수평 방향으로 변경
-                )
-                fig_dept.update_traces(
-                    marker_color='#FF4B4B',
-                    text=dept_counts['인원수'],
-                    textposition='outside',
-                    textfont=dict(size=14)
-                )
-                fig_dept.update_layout(
-                    showlegend=False,
-                    title_x=0.5,
-                    title_y=0.95,
-                    margin=dict(t=50, r=50),  # 오른쪽 여백 추가
-                    xaxis=dict(
-                        title="",
-                        range=[0, max(dept_counts['인원수']) * 1.2]
-                    ),
-                    yaxis=dict(
-                        title="",
-                        autorange="reversed"  # 위에서 아래로 정렬
+                    # 본부별 그래프 (수평 막대 그래프)
+                    fig_dept = px.bar(
+                        dept_counts,
+                        y='본부',
+                        x='인원수',
+                        title="본부별",
+                        width=400,
+                        height=300,
+                        orientation='h'  # 수평 방향으로 변경
                     )
-                )
+                    fig_dept.update_traces(
+                        marker_color='#FF4B4B',
+                        text=dept_counts['인원수'],
+                        textposition='outside',
+                        textfont=dict(size=14)
+                    )
+                    fig_dept.update_layout(
+                        showlegend=False,
+                        title_x=0.5,
+                        title_y=0.95,
+                        margin=dict(t=50, r=50),  # 오른쪽 여백 추가
+                        xaxis=dict(
+                            title="",
+                            range=[0, max(dept_counts['인원수']) * 1.2]
+                        ),
+                        yaxis=dict(
+                            title="",
+                            autorange="reversed"  # 위에서 아래로 정렬
+                        )
+                    )
+                    return fig_dept
+
+                # 데이터 버전·조회 기준일별 캐시된 차트 사용
+                fig_dept = get_cached_figure('인원현황_본부별', get_data_version(), (query_date,), build_dept_chart)
                 st.plotly_chart(fig_dept, use_container_width=True)
             
             with col2:
-                # 직책별 인원 현황
-                position_order = ['C-LEVEL', '실리드', '팀리드', '멤버', '계약직']
-                position_counts = current_employees['직책'].value_counts()
-                position_counts = pd.Series(position_counts.reindex(position_order).fillna(0))
-                position_counts = position_counts.reset_index()
-                position_counts.columns = ['직책', '인원수']
+                def build_position_chart():
+                    # 직책별 인원 현황
+                    position_order = ['C-LEVEL', '실리드', '팀리드', '멤버', '계약직']
+                    position_counts = current_employees['직책'].value_counts()
+                    position_counts = pd.Series(position_counts.reindex(position_order).fillna(0))
+                    position_counts = position_counts.reset_index()
+                    position_counts.columns = ['직책', '인원수']
                 
-                # 직책별 그래프
-                fig_position = px.area(
-                    position_counts,
-                    x='직책',
-                    y='인원수',
-                    title="직책별",
-                    width=400,
-                    height=300
-                )
-                fig_position.update_traces(
-                    fill='tonexty',
-                    line=dict(color='#666666'),
-                    text=position_counts['인원수'],
-                    textposition='top center'
-                )
-                fig_position.update_layout(
-                    showlegend=False,
-                    title_x=0.5,
-                    title_y=0.95,
-                    margin=dict(t=50),
-                    yaxis=dict(range=[0, max(position_counts['인원수']) * 1.2])
-                )
+                    # 직책별 그래프
+                    fig_position = px.area(
+                        position_counts,
+                        x='직책',
+                        y='인원수',
+                        title="직책별",
+                        width=400,
+                        height=300
+                    )
+                    fig_position.update_traces(
+                        fill='tonexty',
+                        line=dict(color='#666666'),
+                        text=position_counts['인원수'],
+                        textposition='top center'
+                    )
+                    fig_position.update_layout(
+                        showlegend=False,
+                        title_x=0.5,
+                        title_y=0.95,
+                        margin=dict(t=50),
+                        yaxis=dict(range=[0, max(position_counts['인원수']) * 1.2])
+                    )
+                    return fig_position
+
+                # 데이터 버전·조회 기준일별 캐시된 차트 사용
+                fig_position = get_cached_figure('인원현황_직책별', get_data_version(), (query_date,), build_position_chart)
                 st.plotly_chart(fig_position, use_container_width=True)
             
             with col3:
-                # 성별 비율 계산 (조회 기준일 기준)
-                gender_counts = current_employees['남/여'].value_counts()
-                gender_percentages = (gender_counts / len(current_employees) * 100).round(1)
-                
-                # 도넛 차트 생성
-                fig = go.Figure(data=[go.Pie(
-                    labels=['남', '여'],
-                    values=[gender_percentages['남'], gender_percentages['여']],
-                    hole=0.4,
-                    marker_colors=['#4A4A4A', '#FF4B4B'],
-                    textinfo='label+percent',
-                    textposition='inside',
-                    showlegend=False,
-                    textfont=dict(color='white')  # 텍스트 색상을 흰색으로 설정
-                )])
+                def build_gender_chart():
+                    # 성별 비율 계산 (조회 기준일 기준)
+                    gender_counts = current_employees['남/여'].value_counts()
+                    gender_percentages = (gender_counts / len(current_employees) * 100).round(1)
                 
-                fig.update_layout(
-                    title="성별",
-                    title_x=0.4,
-                    title_y=0.95,
-                    width=220,
-                    height=220,
-                    margin=dict(t=50, b=0, l=0, r=0),  # 제목을 위한 상단 여백 추가
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    plot_bgcolor='rgba(0,0,0,0)'
-                )
+                    # 도넛 차트 생성
+                    fig = go.Figure(data=[go.Pie(
+                        labels=['남', '여'],
+                        values=[gender_percentages['남'], gender_percentages['여']],
+                        hole=0.4,
+                        marker_colors=['#4A4A4A', '#FF4B4B'],
+                        textinfo='label+percent',
+                        textposition='inside',
+                        showlegend=False,
+                        textfont=dict(color='white')  # 텍스트 색상을 흰색으로 설정
+                    )])
                 
+                    fig.update_layout(
+                        title="성별",
+                        title_x=0.4,
+                        title_y=0.95,
+                        width=220,
+                        height=220,
+                        margin=dict(t=50, b=0, l=0, r=0),  # 제목을 위한 상단 여백 추가
+                        paper_bgcolor='rgba(0,0,0,0)',
+                        plot_bgcolor='rgba(0,0,0,0)'
+                    )
+                    return fig
+
+                # 데이터 버전·조회 기준일별 캐시된 차트 사용
+                fig = get_cached_figure('인원현황_성별', get_data_version(), (query_date,), build_gender_chart)
                 st.plotly_chart(fig)
 
+            # 조직별 인원 현황 (본부 → 실 → 팀 드릴다운, 입사/퇴사는 조회 기준일이 속한 연도 1월 1일부터 집계)
+            st.markdown("###### 조직별 인원 현황")
+            org_col, org_space_col = st.columns([0.3, 0.7])
+            with org_col:
+                org_parent = st.selectbox(
+                    "상위 조직",
+                    options=[()] + sorted(path for path in org_tree['nodes'] if 0 < len(path) < len(org_tree['levels'])),
+                    format_func=lambda path: '전체' if not path else ' > '.join(path),
+                    key='org_parent_select'
+                )
+            with org_space_col:
+                st.write("")  # 빈 공간
+            org_table = query_org_tree(org_tree, query_date, parent=org_parent)
+            st.dataframe(
+                org_table.drop(columns=org_tree['levels'][:len(org_parent)]),
+                hide_index=True,
+                use_container_width=False,
+                width=600
+            )
+
             st.markdown("<br>", unsafe_allow_html=True)
             
-            # 2025년 입퇴사자 현황
-            list_col1, list_col2 = st.columns(2)
-            
-            with list_col1:
-                st.markdown("###### 2025년 입사자")
+            # 2025년 입퇴사자 현황 (조회 조건과 무관 - 데이터 버전별 1회 계산)
+            def compute_year_lists():
                 입사자_df = df[df['입사일'].dt.year == 2025][['성명', '팀', '직위', '입사일']]
                 if not 입사자_df.empty:
                     입사자_df = 입사자_df.sort_values('입사일', ascending=False)  # 내림차순 정렬
@@ -1324,13 +1444,7 @@ def main():
                     입사자_df = 입사자_df.reset_index(drop=True)
                     입사자_df.index = 입사자_df.index + 1
                     입사자_df = 입사자_df.rename_axis('No.')
-                    st.dataframe(입사자_df,
-                               use_container_width=True)
-                else:
-                    st.info("2025년 입사 예정자가 없습니다.")
 
-            with list_col2:
-                st.markdown("###### 2025년 퇴사자(예정자 포함)")
                 퇴사자_df = df[df['퇴사연도'] == 2025][['성명', '팀', '직위', '퇴사일']]
                 if not 퇴사자_df.empty:
                     퇴사자_df = 퇴사자_df.sort_values('퇴사일', ascending=False)  # 내림차순 정렬
@@ -1339,6 +1453,22 @@ def main():
                     퇴사자_df = 퇴사자_df.reset_index(drop=True)
                     퇴사자_df.index = 퇴사자_df.index + 1
                     퇴사자_df = 퇴사자_df.rename_axis('No.')
+                return 입사자_df, 퇴사자_df
+
+            입사자_df, 퇴사자_df = get_section_result('인원현황_입퇴사자', get_data_version(), compute_year_lists)
+            list_col1, list_col2 = st.columns(2)
+            
+            with list_col1:
+                st.markdown("###### 2025년 입사자")
+                if not 입사자_df.empty:
+                    st.dataframe(입사자_df,
+                               use_container_width=True)
+                else:
+                    st.info("2025년 입사 예정자가 없습니다.")
+
+            with list_col2:
+                st.markdown("###### 2025년 퇴사자(예정자 포함)")
+                if not 퇴사자_df.empty:
                     st.dataframe(퇴사자_df,
                                use_container_width=True)
                 else:
@@ -1349,12 +1479,15 @@ def main():
             # 근속기간별 퇴사자 현황 분석
             st.markdown("##### 퇴사자 현황_정규직")
             
+            # 퇴사 집계 큐브 (데이터 버전별 1회 계산)
+            turnover_cube, turnover_headcount = build_turnover_cube(df, get_data_version())
+            
             # 퇴사연도 선택 드롭다운과 퇴사인원 표시를 위한 컬럼 생성
             col1, col2 = st.columns([2, 1])
             
             with col1:
                 # 퇴사연도 선택 드롭다운
-                available_years = sorted(df[df['재직상태'] == '퇴직']['퇴사연도'].dropna().astype(int).unique())
+                available_years = sorted(turnover_cube.index.get_level_values('퇴사연도').dropna().astype(int).unique())
                 default_index = list(['전체'] + list(available_years)).index(2025) if 2025 in available_years else 0
                 selected_year = st.selectbox(
                     "퇴사연도 선택",
@@ -1363,12 +1496,12 @@ def main():
                     key='tenure_year_select'
                 )
             
+            # 선택된 연도의 정규직 퇴사자 셀
+            정규직_퇴사 = slice_turnover_cube(turnover_cube, selected_year)
+            
             with col2:
                 # 선택된 연도의 퇴사인원 계산
-                if selected_year == '전체':
-                    퇴사인원 = len(df[(df['재직상태'] == '퇴직') & (df['고용구분'] == '정규직')])
-                else:
-                    퇴사인원 = len(df[(df['재직상태'] == '퇴직') & (df['퇴사연도'] == selected_year) & (df['고용구분'] == '정규직')])
+                퇴사인원 = int(정규직_퇴사.sum())
                 
                 st.markdown(
                     f"""
@@ -1384,132 +1517,63 @@ def main():
             graph_col, space_col = st.columns([0.5, 0.5])
             
             with graph_col:
-                def calculate_tenure_months(row):
-                    if pd.isna(row['입사일']) or pd.isna(row['퇴사일']):
-                        return None
-                    tenure = row['퇴사일'] - row['입사일']
-                    return tenure.days / 30.44  # 평균 한 달을 30.44일로 계산
-
-                # 근속기간 계산
-                df['근속월수'] = df.apply(calculate_tenure_months, axis=1)
-
-                # 근속기간 구간 설정
-                def get_tenure_category(months):
-                    if pd.isna(months):
-                        return None
-                    elif months <= 5:
-                        return "0~5개월"
-                    elif months <= 11:
-                        return "6~11개월"
-                    elif months <= 24:
-                        return "1년~2년"
-                    elif months <= 36:
-                        return "2년~3년"
-                    else:
-                        return "3년이상"
-
-                df['근속기간_구분'] = df['근속월수'].apply(get_tenure_category)
-
-                # 퇴직자 데이터 필터링
-                퇴직자_df = df[(df['재직상태'] == '퇴직') & (df['고용구분'] == '정규직')]
-                if selected_year != '전체':
-                    퇴직자_df = 퇴직자_df[퇴직자_df['퇴사연도'] == selected_year]
-                
-                # 근속기간별 인원 집계
-                tenure_counts = 퇴직자_df['근속기간_구분'].value_counts().reindex(["0~5개월", "6~11개월", "1년~2년", "2년~3년", "3년이상"], fill_value=0)
+                def build_tenure_chart():
+                    # 근속기간별 인원 집계
+                    tenure_counts = (
+                        정규직_퇴사.groupby(level='근속기간_구분', observed=False).sum()
+                        .reindex(TENURE_CATEGORIES, fill_value=0)
+                    )
 
-                # 그래프 생성
-                fig = go.Figure()
+                    # 그래프 생성
+                    fig = go.Figure()
                 
-                # 막대 색상 설정
-                colors = ['#E0E0E0', '#E0E0E0', '#E0E0E0', '#FF0000', '#FF0000']
+                    # 막대 색상 설정
+                    colors = ['#E0E0E0', '#E0E0E0', '#E0E0E0', '#FF0000', '#FF0000']
                 
-                fig.add_trace(go.Bar(
-                    x=tenure_counts.index,
-                    y=tenure_counts.values,
-                    marker_color=colors,
-                    text=tenure_counts.values,
-                    textposition='outside',
-                ))
-
-                # 레이아웃 설정
-                title_text = f"{'전체 기간' if selected_year == '전체' else str(selected_year) + '년'} 근속기간별 퇴사자 현황"
-                fig.update_layout(
-                    height=300,
-                    showlegend=False,
-                    plot_bgcolor='white',
-                    yaxis=dict(
-                        title="퇴사자 수 (명)",
-                        range=[0, max(max(tenure_counts.values) * 1.2, 10)],
-                        gridcolor='lightgray',
-                        gridwidth=0.5,
-                    ),
-                    xaxis=dict(
-                        showgrid=False,
-                    ),
-                    margin=dict(t=50, b=20)  # 하단 여백을 20으로 줄임
-                )
+                    fig.add_trace(go.Bar(
+                        x=tenure_counts.index,
+                        y=tenure_counts.values,
+                        marker_color=colors,
+                        text=tenure_counts.values,
+                        textposition='outside',
+                    ))
+
+                    # 레이아웃 설정
+                    title_text = f"{'전체 기간' if selected_year == '전체' else str(selected_year) + '년'} 근속기간별 퇴사자 현황"
+                    fig.update_layout(
+                        height=300,
+                        showlegend=False,
+                        plot_bgcolor='white',
+                        yaxis=dict(
+                            title="퇴사자 수 (명)",
+                            range=[0, max(max(tenure_counts.values) * 1.2, 10)],
+                            gridcolor='lightgray',
+                            gridwidth=0.5,
+                        ),
+                        xaxis=dict(
+                            showgrid=False,
+                        ),
+                        margin=dict(t=50, b=20)  # 하단 여백을 20으로 줄임
+                    )
+                    return fig
 
+                # 데이터 버전·퇴사연도별 캐시된 차트 사용
+                fig = get_cached_figure('인원현황_근속기간별퇴사', get_data_version(), (selected_year,), build_tenure_chart)
                 st.plotly_chart(fig, use_container_width=True)
 
             with space_col:
                 st.write("")  # 빈 공간
             
-            # 부서별 근속기간 분석
-            본부별_근속기간 = pd.pivot_table(
-                퇴직자_df,
-                values='사번',
-                index='본부',
-                columns='근속기간_구분',
-                aggfunc='count',
-                fill_value=0
-            ).reindex(columns=["0~5개월", "6~11개월", "1년~2년", "2년~3년", "3년이상"])
-
-            # 재직자 수 계산
-            재직자_수 = df[df['재직상태'] == '재직'].groupby('본부')['사번'].count()
-
-            # 퇴직자 수 계산 - 선택된 연도에 따라 필터링
-            if selected_year == '전체':
-                퇴직자_수 = df[(df['재직상태'] == '퇴직') & (df['고용구분'] == '정규직')].groupby('본부')['사번'].count()
-            else:
-                퇴직자_수 = df[(df['재직상태'] == '퇴직') & (df['고용구분'] == '정규직') & (df['퇴사연도'] == selected_year)].groupby('본부')['사번'].count()
-
-            # 퇴사율 계산
-            본부별_퇴사율 = (퇴직자_수 / (재직자_수 + 퇴직자_수) * 100).round(1)
-
-            # 조기퇴사율 계산 (1년 미만 퇴사자)
-            조기퇴사자_수 = 본부별_근속기간[["0~5개월", "6~11개월"]].sum(axis=1)
-            조기퇴사율 = (조기퇴사자_수 / (재직자_수 + 퇴직자_수) * 100).round(1)
-
-            # 결과 테이블 생성
-            result_df = pd.DataFrame({
-                '0~5개월': 본부별_근속기간["0~5개월"],
-                '6~11개월': 본부별_근속기간["6~11개월"],
-                '1년~2년': 본부별_근속기간["1년~2년"],
-                '2년~3년': 본부별_근속기간["2년~3년"],
-                '3년이상': 본부별_근속기간["3년이상"],
-                '퇴직인원': 퇴직자_수,
-                '재직인원': 재직자_수,
-                '퇴사율': 본부별_퇴사율.fillna(0).map('{:.1f}%'.format),
-                '조기퇴사율': 조기퇴사율.fillna(0).map('{:.1f}%'.format),
-                '퇴사율 비중': 본부별_퇴사율.fillna(0).map('{:.1f}%'.format)
-            }).fillna(0)
-
-            # 합계 행 추가
-            total_row = pd.Series({
-                '0~5개월': result_df['0~5개월'].sum(),
-                '6~11개월': result_df['6~11개월'].sum(),
-                '1년~2년': result_df['1년~2년'].sum(),
-                '2년~3년': result_df['2년~3년'].sum(),
-                '3년이상': result_df['3년이상'].sum(),
-                '퇴직인원': result_df['퇴직인원'].sum(),
-                '재직인원': result_df['재직인원'].sum(),
-                '퇴사율': f"{(result_df['퇴직인원'].sum() / (result_df['재직인원'].sum() + result_df['퇴직인원'].sum()) * 100):.1f}%",
-                '조기퇴사율': f"{(result_df['0~5개월'].sum() + result_df['6~11개월'].sum()) / (result_df['재직인원'].sum() + result_df['퇴직인원'].sum()) * 100:.1f}%",
-                '퇴사율 비중': f"{(result_df['퇴직인원'].sum() / (result_df['재직인원'].sum() + result_df['퇴직인원'].sum()) * 100):.1f}%"
-            }, name='총합계')
-
-            result_df = pd.concat([result_df, pd.DataFrame(total_row).T])
+            # 구분별 근속기간 분석 (퇴사 집계 큐브에서 계산)
+            by_col, by_space_col = st.columns([0.2, 0.8])
+            with by_col:
+                turnover_by = st.selectbox("집계 기준", ["본부", "팀", "직위"], key='turnover_by_select')
+            with by_space_col:
+                st.write("")  # 빈 공간
+            result_df = get_section_result(
+                '인원현황_퇴사율표', get_data_version(),
+                lambda: build_turnover_table(정규직_퇴사, turnover_headcount, by=turnover_by)
+            )
 
             # 스타일이 적용된 테이블 표시
             st.markdown(
@@ -1544,78 +1608,15 @@ def main():
             )
 
             # 테이블 HTML 생성
-            table_html = "<table class='custom-table'><tr><th>구분</th>"
-            for col in result_df.columns:
-                table_html += f"<th>{col}</th>"
-            table_html += "</tr>"
-
-            for idx, row in result_df.iterrows():
-                table_html += f"<tr><td>{idx}</td>"
-                for col in result_df.columns:
-                    value = row[col]
-                    if isinstance(value, (int, float)):
-                        if col in ['0~5개월', '6~11개월', '1년~2년', '2년~3년', '3년이상', '퇴직인원', '재직인원']:
-                            table_html += f"<td>{int(value)}</td>"
-                        else:
-                            table_html += f"<td>{value}</td>"
-                    else:
-                        if '%' in str(value) and float(str(value).rstrip('%')) > 0:
-                            table_html += f"<td class='red-text'>{value}</td>"
-                        else:
-                            table_html += f"<td>{value}</td>"
-                table_html += "</tr>"
-            table_html += "</table>"
-
+            table_html = render_turnover_table_html(result_df, get_data_version(), selected_year, turnover_by)
             st.markdown(table_html, unsafe_allow_html=True)
 
             st.markdown("<br>", unsafe_allow_html=True)
 
         elif menu == "📈 연도별 인원 통계":
-            # 최근 5년간 인원 현황 분석
+            # 연도별 인원 현황 분석 (기본 최근 5년)
             st.markdown("##### 📈 연도별 인원 통계")
             
-            def get_year_end_headcount(df, year):
-                # 해당 연도 말일 설정
-                year_end = pd.Timestamp(f"{year}-12-31")
-                
-                # 해당 연도 말일 기준 재직자 수 계산
-                # 입사일이 연도 말일 이전이고, 퇴사일이 없거나 연도 말일과 같거나 이후인 직원
-                year_end_employees = df[
-                    (df['입사일'] <= year_end) & 
-                    ((df['퇴사일'].isna()) | (df['퇴사일'] >= year_end))
-                ]
-                
-                # 전체 인원
-                total = len(year_end_employees)
-                
-                # 정규직/계약직 인원
-                regular = len(year_end_employees[year_end_employees['고용구분'] == '정규직'])
-                contract = len(year_end_employees[year_end_employees['고용구분'] == '계약직'])
-                
-                return total, regular, contract
-            
-            # 연도별 입/퇴사 인원 계산 함수 (get_year_end_headcount 함수 다음에 추가)
-            @st.cache_data(ttl=3600)  # 1시간 캐시 유지
-            def get_year_employee_stats(df, year):
-                """연도별 입사/퇴사 통계를 계산하는 함수"""
-                # 정규직 입사
-                reg_join = len(df[(df['고용구분'] == '정규직') & 
-                                 (df['입사일'].dt.year == year)])
-                
-                # 정규직 퇴사
-                reg_leave = len(df[(df['고용구분'] == '정규직') & 
-                                  (df['퇴사일'].dt.year == year)])
-                
-                # 계약직 입사
-                contract_join = len(df[(df['고용구분'] == '계약직') & 
-                                      (df['입사일'].dt.year == year)])
-                
-                # 계약직 퇴사
-                contract_leave = len(df[(df['고용구분'] == '계약직') & 
-                                       (df['퇴사일'].dt.year == year)])
-                
-                return reg_join, reg_leave, contract_join, contract_leave
-            
             def load_yearly_stats_data():
                 """SharePoint에서 임직원 기초 데이터를 로드하는 함수"""
                 try:
@@ -1640,113 +1641,128 @@ def main():
             df = load_yearly_stats_data()
             
             if df is not None:
+                # 연도별 통계 (데이터 버전별 1회 계산)
+                yearly_stats = build_yearly_stats(df, get_data_version())
+                available_years = yearly_stats['연도'].tolist()
+
+                # 조회 연도 범위 선택 (기본값: 최근 5년)
+                year_col, year_space_col = st.columns([0.4, 0.6])
+                with year_space_col:
+                    st.write("")  # 빈 공간
+                with year_col:
+                    year_range = st.select_slider(
+                        "조회 연도",
+                        options=available_years,
+                        value=(max(available_years[0], available_years[-1] - 4), available_years[-1]),
+                        key="stats_year_range"
+                    )
+
                 # stats_df 생성
-                stats_df = pd.DataFrame([
-                    {
-                        '연도': year,
-                        '전체': get_year_end_headcount(df, year)[0],
-                        '정규직_전체': get_year_end_headcount(df, year)[1],
-                        '계약직_전체': get_year_end_headcount(df, year)[2],
-                        '정규직_입사': get_year_employee_stats(df, year)[0],
-                        '정규직_퇴사': get_year_employee_stats(df, year)[1],
-                        '계약직_입사': get_year_employee_stats(df, year)[2],
-                        '계약직_퇴사': get_year_employee_stats(df, year)[3]
-                    }
-                    for year in range(2021, 2026)  # 2021년부터 2025년까지
-                ])
+                stats_df = yearly_stats[
+                    (yearly_stats['연도'] >= year_range[0]) &
+                    (yearly_stats['연도'] <= year_range[1])
+                ].reset_index(drop=True)
 
             # 그래프를 위한 컬럼 생성 (50:50 비율)
             graph_col1, space_col1,  graph_col2, space_col2 = st.columns([0.35,0.05, 0.35, 0.2])
             
             with graph_col1:
-                # 전체 인원 그래프 생성
-                fig = go.Figure()
+                def build_total_chart():
+                    # 전체 인원 그래프 생성
+                    fig = go.Figure()
                 
-                fig.add_trace(go.Scatter(
-                    x=stats_df['연도'],
-                    y=stats_df['전체'],
-                    mode='lines+markers+text',
-                    name='전체 인원',
-                    text=stats_df['전체'],
-                    textposition='top center',
-                    line=dict(color='#FF4B4B', width=3),
-                    marker=dict(size=10)
-                ))
-
-                fig.update_layout(
-                    title="전체 인원",
-                    title_x=0,
-                    height=350,
-                    showlegend=False,
-                    plot_bgcolor='white',
-                    yaxis=dict(
-                        title="인원 수 (명)",
-                        gridcolor='lightgray',
-                        gridwidth=0.5,
-                        range=[0, max(stats_df['전체']) * 1.2]
-                    ),
-                    xaxis=dict(
-                        showgrid=False,
-                        tickformat='d'  # 정수 형식으로 표시
-                    ),
-                    margin=dict(t=50)
-                )
+                    fig.add_trace(go.Scatter(
+                        x=stats_df['연도'],
+                        y=stats_df['전체'],
+                        mode='lines+markers+text',
+                        name='전체 인원',
+                        text=stats_df['전체'],
+                        textposition='top center',
+                        line=dict(color='#FF4B4B', width=3),
+                        marker=dict(size=10)
+                    ))
+
+                    fig.update_layout(
+                        title="전체 인원",
+                        title_x=0,
+                        height=350,
+                        showlegend=False,
+                        plot_bgcolor='white',
+                        yaxis=dict(
+                            title="인원 수 (명)",
+                            gridcolor='lightgray',
+                            gridwidth=0.5,
+                            range=[0, max(stats_df['전체']) * 1.2]
+                        ),
+                        xaxis=dict(
+                            showgrid=False,
+                            tickformat='d'  # 정수 형식으로 표시
+                        ),
+                        margin=dict(t=50)
+                    )
+                    return fig
 
+                # 데이터 버전·조회 연도별 캐시된 차트 사용
+                fig = get_cached_figure('연도별_전체인원', get_data_version(), tuple(year_range), build_total_chart)
                 st.plotly_chart(fig, use_container_width=True)
 
             with space_col1:
                 st.write("")  # 빈 공간
 
             with graph_col2:
-                # 정규직/계약직 막대 그래프 생성
-                fig2 = go.Figure()
-
-                # 정규직 막대
-                fig2.add_trace(go.Bar(
-                    x=stats_df['연도'],
-                    y=stats_df['정규직_전체'],
-                    name='정규직',
-                    text=stats_df['정규직_전체'],
-                    textposition='auto',
-                    textfont=dict(color='white'),
-                    marker_color='#FF4B4B'
-                ))
-
-                # 계약직 막대
-                fig2.add_trace(go.Bar(
-                    x=stats_df['연도'],
-                    y=stats_df['계약직_전체'],
-                    name='계약직',
-                    text=stats_df['계약직_전체'],
-                    textposition='auto',
-                    marker_color='#FFB6B6'
-                ))
-
-                fig2.update_layout(
-                    title="고용형태별 인원",
-                    title_x=0,
-                    height=350,
-                    barmode='stack',
-                    plot_bgcolor='white',
-                    yaxis=dict(
-                        gridcolor='lightgray',
-                        gridwidth=0.5,
-                        range=[0, max(stats_df['전체']) * 1.2]
-                    ),
-                    xaxis=dict(
-                        showgrid=False,
-                        tickformat='d'  # 정수 형식으로 표시
-                    ),
-                    margin=dict(t=50),
-                    legend=dict(
-                        orientation="h",
-                        yanchor="bottom",
-                        y=1.02,
-                        xanchor="right",
-                        x=1
+                def build_employment_chart():
+                    # 정규직/계약직 막대 그래프 생성
+                    fig2 = go.Figure()
+
+                    # 정규직 막대
+                    fig2.add_trace(go.Bar(
+                        x=stats_df['연도'],
+                        y=stats_df['정규직_전체'],
+                        name='정규직',
+                        text=stats_df['정규직_전체'],
+                        textposition='auto',
+                        textfont=dict(color='white'),
+                        marker_color='#FF4B4B'
+                    ))
+
+                    # 계약직 막대
+                    fig2.add_trace(go.Bar(
+                        x=stats_df['연도'],
+                        y=stats_df['계약직_전체'],
+                        name='계약직',
+                        text=stats_df['계약직_전체'],
+                        textposition='auto',
+                        marker_color='#FFB6B6'
+                    ))
+
+                    fig2.update_layout(
+                        title="고용형태별 인원",
+                        title_x=0,
+                        height=350,
+                        barmode='stack',
+                        plot_bgcolor='white',
+                        yaxis=dict(
+                            gridcolor='lightgray',
+                            gridwidth=0.5,
+                            range=[0, max(stats_df['전체']) * 1.2]
+                        ),
+                        xaxis=dict(
+                            showgrid=False,
+                            tickformat='d'  # 정수 형식으로 표시
+                        ),
+                        margin=dict(t=50),
+                        legend=dict(
+                            orientation="h",
+                            yanchor="bottom",
+                            y=1.02,
+                            xanchor="right",
+                            x=1
+                        )
                     )
-                )
+                    return fig2
 
+                # 데이터 버전·조회 연도별 캐시된 차트 사용
+                fig2 = get_cached_figure('연도별_고용형태별', get_data_version(), tuple(year_range), build_employment_chart)
                 st.plotly_chart(fig2, use_container_width=True)
 
             with space_col2:
@@ -1784,6 +1800,80 @@ def main():
                 use_container_width=False
             )
 
+            # 기간별 인원 추이 (일별 시계열 사전계산 결과 사용)
+            if df is not None:
+                st.markdown("<br>", unsafe_allow_html=True)
+                st.markdown("###### 기간별 인원 추이")
+                daily_headcount = build_daily_headcount(df, get_data_version())
+
+                if not daily_headcount.empty:
+                    first_day = daily_headcount.index[0].date()
+                    last_day = daily_headcount.index[-1].date()
+
+                    trend_col1, trend_col2, trend_col3, trend_col4 = st.columns([0.2, 0.2, 0.2, 0.4])
+                    with trend_col1:
+                        trend_start = st.date_input(
+                            "시작일",
+                            value=max(first_day, last_day - relativedelta(years=5)),
+                            min_value=first_day,
+                            max_value=last_day,
+                            key="trend_start_date"
+                        )
+                    with trend_col2:
+                        trend_end = st.date_input(
+                            "종료일",
+                            value=last_day,
+                            min_value=first_day,
+                            max_value=last_day,
+                            key="trend_end_date"
+                        )
+                    with trend_col3:
+                        trend_granularity = st.selectbox("집계 단위", ["일별", "월별", "분기별"], index=1, key="trend_granularity")
+                    with trend_col4:
+                        trend_split = st.radio("구분", ["전체", "고용구분", "본부"], horizontal=True, key="trend_split")
+
+                    trend_df = resample_headcount(daily_headcount, trend_start, trend_end, trend_granularity, trend_split)
+
+                    if not trend_df.empty:
+                        def build_trend_chart():
+                            fig_trend = go.Figure()
+                            for col in trend_df.columns:
+                                fig_trend.add_trace(go.Scatter(
+                                    x=trend_df.index,
+                                    y=trend_df[col],
+                                    mode='lines' if trend_granularity == '일별' else 'lines+markers',
+                                    name=str(col),
+                                    line=dict(color='#FF4B4B', width=3) if trend_split == '전체' else None
+                                ))
+
+                            fig_trend.update_layout(
+                                height=400,
+                                showlegend=trend_split != '전체',
+                                plot_bgcolor='white',
+                                yaxis=dict(
+                                    title="인원 수 (명)",
+                                    gridcolor='lightgray',
+                                    gridwidth=0.5,
+                                    rangemode='tozero'
+                                ),
+                                xaxis=dict(showgrid=False),
+                                margin=dict(t=30),
+                                legend=dict(
+                                    orientation="h",
+                                    yanchor="bottom",
+                                    y=1.02,
+                                    xanchor="right",
+                                    x=1
+                                )
+                            )
+                            return fig_trend
+
+                        # 데이터 버전·조회 조건별 캐시된 차트 사용
+                        fig_trend = get_cached_figure('연도별_기간별추이', get_data_version(), (trend_start, trend_end, trend_granularity, trend_split), build_trend_chart)
+                        st.plotly_chart(fig_trend, use_container_width=True)
+                    else:
+                        st.info("선택한 기간에 해당하는 데이터가 없습니다.")
+
         elif menu == "🔍 연락처/생일 검색":
             st.markdown("##### 🔍 연락처/생일 검색")
             
@@ -1803,7 +1893,8 @@ def main():
                 st.markdown('</div>', unsafe_allow_html=True)
             
             if search_name:
-                contact_df = df[df['성명'].str.contains(search_name, na=False)]
+                name_index = build_name_index(df['성명'], (get_data_version(), '임직원'))
+                contact_df = filter_by_name(df, search_name, name_index)
                 if not contact_df.empty:
                     st.markdown("""
                         <style>
@@ -1875,39 +1966,8 @@ def main():
                 </style>
             """, unsafe_allow_html=True)
             
-            # 데이터 로드
-            df = load_data()
+            # 데이터 (메인에서 로드/날짜 변환한 임직원 데이터 사용)
             if df is not None:
-                # 날짜 컬럼 변환 함수
-                def convert_date(date_value):
-                    if pd.isna(date_value):
-                        return pd.NaT
-                    try:
-                        # 엑셀 숫자 형식의 날짜 처리
-                        if isinstance(date_value, (int, float)):
-                            return pd.Timestamp('1899-12-30') + pd.Timedelta(days=int(date_value))
-                        
-                        # 문자열로 변환
-                        date_str = str(date_value)
-                        
-                        # 여러 날짜 형식 시도
-                        formats = ['%Y-%m-%d', '%Y/%m/%d', '%Y.%m.%d', '%Y%m%d']
-                        for fmt in formats:
-                            try:
-                                return pd.to_datetime(date_str, format=fmt)
-                            except:
-                                continue
-                        
-                        # 모든 형식이 실패하면 기본 변환 시도
-                        return pd.to_datetime(date_str)
-                    except:
-                        return pd.NaT
-
-                # 날짜 컬럼 변환
-                df['입사일'] = df['입사일'].apply(convert_date)
-                df['퇴사일'] = df['퇴사일'].apply(convert_date)
-                
-                
                 # 조회 기준일 설정
                 current_date = datetime.now()
                 col1, col2 = st.columns([0.3, 0.7])
@@ -1925,101 +1985,26 @@ def main():
                 # 선택된 날짜를 timestamp로 변환
                 last_day = pd.Timestamp(selected_date)
                 
-                # 기준일에 재직중인 직원 필터링
-                current_employees = df[
-                    (df['입사일'].notna()) & 
-                    (df['입사일'] <= last_day) & 
-                    ((df['퇴사일'].isna()) | 
-                     (df['퇴사일'] == pd.Timestamp('2050-12-31')) | 
-                     (df['퇴사일'] >= last_day))
-                ]
-                # '구분1', '구분2', '구분3', '성명'이 '0'인 행 제외
-                current_employees = current_employees[
-                    (current_employees['구분1'] != '0') &
-                    (current_employees['구분2'] != '0') &
-                    (current_employees['구분3'] != '0') &
-                    (current_employees['성명'] != '0')
-                ].copy()
-                
-                if not df[df['입사일'] <= last_day].empty:
-                    # 구분별 인원 현황 계산 및 표시
-                    # 구분1: 주주간담회 등 IR팀 자료
-                    st.markdown("1. 주주간담회 등 IR팀 자료 작성용")
-                    group1_stats = current_employees['구분1'].value_counts().reset_index()
-                    group1_stats.columns = ['구분', '인원수']
-                    total_count1 = group1_stats['인원수'].sum()
-                    
-                    # '임원'이 있는 행을 찾아서 첫 번째로 이동
-                    임원_row = group1_stats[group1_stats['구분'] == '임원']
-                    other_rows = group1_stats[group1_stats['구분'] != '임원']
-                    group1_stats = pd.concat([임원_row, other_rows]).reset_index(drop=True)
-                    
-                    group1_stats = group1_stats.T  # 행과 열을 바꿈
-                    group1_stats.columns = group1_stats.iloc[0]  # 첫 번째 행을 컬럼명으로 설정
-                    group1_stats = group1_stats.iloc[1:]  # 첫 번째 행 제외
-                    group1_stats['총인원'] = total_count1  # 총인원 열 추가
-                    st.dataframe(
-                        group1_stats,
-                        use_container_width=False,
-                        width=900,
-                        column_config={col: st.column_config.NumberColumn(col, width=50) for col in group1_stats.columns}
-                    )
-                    
-                    # 구분2: 투자자 사업현황 보고1
-                    st.markdown("2. 투자자 사업현황 보고")
-                    group2_stats = current_employees['구분2'].value_counts().reset_index()
-                    group2_stats.columns = ['구분', '인원수']
-                    total_count2 = group2_stats['인원수'].sum()
-                    
-                    # '임원'이 있는 행을 찾아서 첫 번째로 이동
-                    임원_row = group2_stats[group2_stats['구분'] == '임원']
-                    other_rows = group2_stats[group2_stats['구분'] != '임원']
-                    group2_stats = pd.concat([임원_row, other_rows]).reset_index(drop=True)
-                    
-                    group2_stats = group2_stats.T  # 행과 열을 바꿈
-                    group2_stats.columns = group2_stats.iloc[0]  # 첫 번째 행을 컬럼명으로 설정
-                    group2_stats = group2_stats.iloc[1:]  # 첫 번째 행 제외
-                    group2_stats['총인원'] = total_count2  # 총인원 열 추가
-                    st.dataframe(
-                        group2_stats,
-                        use_container_width=False,
-                        width=600,
-                        column_config={col: st.column_config.NumberColumn(col, width=50) for col in group2_stats.columns}
-                    )
-                    
-                    # 구분3: 의료기기 생산 및 수출·수입·수리실적보고
-                    st.markdown("3. 의료기기 생산 및 수출·수입·수리실적보고")
-                    group3_stats = current_employees['구분3'].value_counts().reset_index()
-                    group3_stats.columns = ['구분', '인원수']
-                    total_count3 = group3_stats['인원수'].sum()
-                    
-                    # '임원'이 있는 행을 찾아서 첫 번째로 이동
-                    임원_row = group3_stats[group3_stats['구분'] == '임원']
-                    other_rows = group3_stats[group3_stats['구분'] != '임원']
-                    group3_stats = pd.concat([임원_row, other_rows]).reset_index(drop=True)
-                    
-                    group3_stats = group3_stats.T  # 행과 열을 바꿈
-                    group3_stats.columns = group3_stats.iloc[0]  # 첫 번째 행을 컬럼명으로 설정
-                    group3_stats = group3_stats.iloc[1:]  # 첫 번째 행 제외
-                    group3_stats['총인원'] = total_count3  # 총인원 열 추가
-                    st.dataframe(
-                        group3_stats,
-                        use_container_width=False,
-                        width=700,
-                        column_config={col: st.column_config.NumberColumn(col, width=50) for col in group3_stats.columns}
-                    )
+                if (df['입사일'] <= last_day).any():
+                    # 기준일 재직자의 구분1/2/3별 인원 현황 (기준일·데이터 버전별 캐시)
+                    group_stats, current_employees = build_agency_report(df, get_data_version(), selected_date)
+
+                    for title, group_col, table_width in [
+                        ("1. 주주간담회 등 IR팀 자료 작성용", '구분1', 900),
+                        ("2. 투자자 사업현황 보고", '구분2', 600),
+                        ("3. 의료기기 생산 및 수출·수입·수리실적보고", '구분3', 700),
+                    ]:
+                        st.markdown(title)
+                        st.dataframe(
+                            group_stats[group_col],
+                            use_container_width=False,
+                            width=table_width,
+                            column_config={col: st.column_config.NumberColumn(col, width=50) for col in group_stats[group_col].columns}
+                        )
                     
                     # 인원상세 목록
                     st.markdown("###### 🧑 인원상세")
-                    detail_columns = ['성명', '본부', '실', '팀', '고용구분', '입사일', '재직상태', '남/여', '구분1', '구분2', '구분3']
-                    detail_df = current_employees[detail_columns].copy()
-                    detail_df['입사일'] = detail_df['입사일'].dt.strftime('%Y-%m-%d')
-                    
-                    # 인덱스를 1부터 시작하는 번호로 리셋
-                    detail_df = detail_df.reset_index(drop=True)
-                    detail_df.index = detail_df.index + 1
-                    detail_df.index.name = 'No'
-                    detail_df = detail_df.reset_index()
+                    detail_df = build_agency_detail(current_employees)
                     
                     st.dataframe(
                         detail_df,
@@ -2040,19 +2025,61 @@ def main():
                         }
                     )
                     
-                    # 엑셀 다운로드 버튼
-                    output = BytesIO()
-                    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                        detail_df.to_excel(writer, index=False)
-                    excel_data = output.getvalue()
-                    st.download_button(
+                    # 엑셀 다운로드 버튼 (요청 시 생성)
+                    render_export_button(
+                        '기관제출용_상세', (selected_date,), get_data_version(),
+                        lambda: convert_df_to_excel(detail_df, sheet_name='Sheet1'),
                         label="📥 엑셀 다운로드",
-                        data=excel_data,
                         file_name=f"기관제출용_인원현황_{selected_date.strftime('%Y%m%d')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        key="agency_detail_download"
+                    )
+                    render_frame_exports(
+                        '기관제출용_상세', (selected_date,), get_data_version(), lambda: detail_df,
+                        f"기관제출용_인원현황_{selected_date.strftime('%Y%m%d')}", "agency_detail_download"
                     )
                 else:
-                    st.warning(f"{selected_year}년 {selected_month}월 데이터가 없습니다.")
+                    st.warning(f"{selected_date.strftime('%Y-%m-%d')} 기준 데이터가 없습니다.")
+
+                # 여러 기준일(월말) 일괄 생성 - 기준일별 시트로 구성된 하나의 엑셀 파일
+                st.markdown("<br>", unsafe_allow_html=True)
+                st.markdown("###### 📑 월말 기준 일괄 생성")
+                batch_col1, batch_col2, batch_col3 = st.columns([0.2, 0.2, 0.6])
+                with batch_col1:
+                    batch_start = st.date_input(
+                        "시작일",
+                        value=datetime(current_date.year, 1, 1).date(),
+                        min_value=datetime(2016, 1, 1).date(),
+                        max_value=current_date.date(),
+                        format="YYYY-MM-DD",
+                        key="agency_batch_start"
+                    )
+                with batch_col2:
+                    batch_end = st.date_input(
+                        "종료일",
+                        value=current_date.date(),
+                        min_value=datetime(2016, 1, 1).date(),
+                        max_value=current_date.date(),
+                        format="YYYY-MM-DD",
+                        key="agency_batch_end"
+                    )
+                with batch_col3:
+                    st.write("")  # 공백 컬럼
+
+                # 기간 내 월말 기준일 목록
+                batch_dates = tuple(d.date() for d in pd.date_range(batch_start, batch_end, freq='ME'))
+                if batch_dates:
+                    st.caption(f"기준일 {len(batch_dates)}개: {batch_dates[0]} ~ {batch_dates[-1]} (월말)")
+                    render_export_button(
+                        '기관제출용_일괄', batch_dates, get_data_version(),
+                        lambda: build_agency_workbook(df, get_data_version(), batch_dates),
+                        label="📥 일괄 엑셀 다운로드",
+                        file_name=f"기관제출용_인원현황_{batch_dates[0].strftime('%Y%m%d')}_{batch_dates[-1].strftime('%Y%m%d')}.xlsx",
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        key="agency_batch_download"
+                    )
+                else:
+                    st.info("선택한 기간에 월말 기준일이 없습니다.")
             else:
                 st.error("데이터를 불러오는 중 오류가 발생했습니다.")
 
@@ -2163,55 +2190,11 @@ def main():
 
                 if submitted:
                     try:                      
-                        # salary_table.xlsx 파일을 SharePoint에서 읽기
-                        # MSAL 설정
-                        authority = f"https://login.microsoftonline.com/{st.secrets['AZURE_AD_TENANT_ID']}"
-                        app = msal.ConfidentialClientApplication(
-                            client_id=st.secrets['AZURE_AD_CLIENT_ID'],
-                            client_credential=st.secrets['AZURE_AD_CLIENT_SECRET'],
-                            authority=authority
-                        )
-
-                        # 토큰 받기
-                        scopes = ["https://graph.microsoft.com/.default"]
-                        result = app.acquire_token_for_client(scopes=scopes)
-                        
-                        if "access_token" not in result:
-                            st.error("토큰을 받아오는데 실패했습니다.")
+                        # 임금테이블 인덱스 (salary_table.xlsx 파일 버전별 1회 로딩)
+                        salary_bands = load_salary_bands()
+                        if salary_bands is None:
+                            st.error("임금 테이블 파일을 불러올 수 없습니다.")
                             st.stop()
-                            
-                        access_token = result['access_token']
-                        headers = {'Authorization': f'Bearer {access_token}'}
-                        
-                        # 사이트 정보 가져오기
-                        site_response = requests.get(
-                            "https://graph.microsoft.com/v1.0/sites/neurophet.sharepoint.com:/sites/team.hr",
-                            headers=headers
-                        )
-                        site_response.raise_for_status()
-                        site_info = site_response.json()
-                        
-                        # 파일 경로 (Shared Documents → General 하위)
-                        file_path = "General/00_2. HRmate/salary_table.xlsx"
-                        drive_items = requests.get(
-                            f"https://graph.microsoft.com/v1.0/sites/{site_info['id']}/drive/root:/{file_path}",
-                            headers=headers
-                        )
-                        drive_items.raise_for_status()
-                        file_info = drive_items.json()
-                        
-                        # 파일 다운로드
-                        download_url = file_info['@microsoft.graph.downloadUrl']
-                        file_response = requests.get(download_url)
-                        file_response.raise_for_status()
-
-                        # 파일 읽기
-                        salary_table = pd.read_excel(BytesIO(file_response.content))
-                        
-                        # 숫자 컬럼들을 float 타입으로 변환
-                        numeric_columns = ['최소연봉', '평균연봉', '최대연봉', '연차']
-                        for col in numeric_columns:
-                            salary_table[col] = pd.to_numeric(salary_table[col], errors='coerce')
                         
                         # 선택된 직군상세에 해당하는 직군 가져오기
                         selected_job_category = job_mapping[job_role]
@@ -2223,22 +2206,14 @@ def main():
                             st.error(f"경력 기간을 정수로 변환하는 중 오류가 발생했습니다. 입력된 경력 기간: {years}")
                             st.stop()
                             
-                        filtered_data = salary_table[
-                            (salary_table['직군'] == selected_job_category) & 
-                            (salary_table['연차'] == years_int)
-                        ]
+                        band, related_data = lookup_salary_band(salary_bands, selected_job_category, years_int)
                         
-                        if filtered_data.empty:
+                        if band is None:
                             st.warning(f"선택하신 직군 '{job_role}' ({selected_job_category})과 연차 {years_int}년에 해당하는 데이터가 없습니다.")
                             st.stop()
                         
-                        # 첫 번째 행 선택
-                        filtered_data = filtered_data.iloc[0]
-                        
                         # 해당 직군의 임금 데이터 가져오기
-                        min_salary = round(float(filtered_data['최소연봉']))
-                        max_salary = round(float(filtered_data['최대연봉']))
-                        avg_salary = round(float(filtered_data['평균연봉']))
+                        min_salary, avg_salary, max_salary = (round(float(value)) for value in band)
 
                         # 분석 결과 표시
                         st.markdown("<br>", unsafe_allow_html=True)
@@ -2260,19 +2235,8 @@ def main():
                         # 컬럼으로 공간 분리
                         col1, col2 = st.columns([0.6, 0.4])
                         with col1:
-                            # salary_table 관련 데이터 표시
-                            related_years = [years_int-1, years_int, years_int+1]
-                            related_data = salary_table[
-                                (salary_table['직군'] == selected_job_category) & 
-                                (salary_table['연차'].isin(related_years))
-                            ].sort_values('연차')
-                            
+                            # salary_table 관련 데이터 표시 (전후 1년 연차, 연봉은 반올림한 정수)
                             if not related_data.empty:
-                                # 모든 연봉 컬럼을 반올림하여 정수로 변환
-                                related_data['최소연봉'] = related_data['최소연봉'].astype(float).round().astype(int)
-                                related_data['평균연봉'] = related_data['평균연봉'].astype(float).round().astype(int)
-                                related_data['최대연봉'] = related_data['최대연봉'].astype(float).round().astype(int)
-                                
                                 st.dataframe(
                                     related_data[['연차', '최소연봉', '평균연봉', '최대연봉']].rename(
                                         columns={
@@ -2416,28 +2380,11 @@ def main():
                         # 필터링된 데이터가 있을 때만 표시
                         if not filtered_df.empty:
                             # 월별 본부별 초과근무 합계 표시                                                      
-                            # 시간을 숫자로 변환
-                            filtered_df['초과시간'] = filtered_df['초과시간'].apply(lambda x: float(x.hour) + float(x.minute)/60 if hasattr(x, 'hour') and hasattr(x, 'minute') else float(x))
-                            
-                            # 피벗 테이블 생성
-                            pivot_df = pd.pivot_table(
-                                filtered_df,
-                                values='초과시간',
-                                index='연월구분',
-                                columns='본부',
-                                aggfunc='sum',
-                                fill_value=0
+                            # 본부별 초과근무 합계/인원수 (조직별 롤업, 데이터 버전별 1회 집계)
+                            overtime_rollup = build_overtime_rollup(
+                                overtime_df, get_data_version(OVERTIME_FILE_PATH)
                             )
-                            
-                            # 전체 합계 열 추가
-                            pivot_df['전체 합계'] = pivot_df.sum(axis=1)
-                            
-                            # 본부별 인원수 계산
-                            employee_count = filtered_df.groupby('본부')['이름'].nunique()
-                            employee_count['전체 합계'] = employee_count.sum()
-                            
-                            # 인원수 행 추가
-                            pivot_df.loc['인원수'] = employee_count
+                            pivot_df = build_overtime_pivot(overtime_rollup, selected_month)
                             
                             # 시간을 소수점 한 자리로 변환 (인원수 행 제외)
                             for col in pivot_df.columns:
@@ -2450,26 +2397,7 @@ def main():
                                     use_container_width=True,
                                 )
                             # 이름과 이메일로 그룹화하여 초과근무 내역과 시간 합계 계산
-                            # 시간을 숫자로 변환하여 합산
-                            filtered_df['초과시간'] = filtered_df['초과시간'].apply(lambda x: float(x.hour) + float(x.minute)/60 if hasattr(x, 'hour') and hasattr(x, 'minute') else float(x))
-                            
-                            # 초과근무 내용 컬럼명 확인
-                            content_column = '초과근무 내용' if '초과근무 내용' in filtered_df.columns else '초과근무내용'
-                            
-                            result_df = filtered_df.groupby(['이름', '이메일']).agg({
-                                content_column: lambda x: '\n'.join(x),  # 일반 줄바꿈 문자 사용
-                                '초과시간': 'sum'
-                            }).reset_index()
-                            
-                            # 시간을 시:분 형식으로 변환
-                            result_df['초과근무시간 합'] = result_df['초과시간'].apply(lambda x: f"{int(x)}시간 {int((x % 1) * 60)}분")
-                            
-                            # 컬럼명 변경
-                            result_df = result_df.rename(columns={content_column: '초과근무 내역'})
-                            result_df = result_df[['이름', '초과근무시간 합',  '초과근무 내역', '이메일']]
-                            
-                            # 인덱스를 1부터 시작하도록 설정
-                            result_df.index = range(1, len(result_df) + 1)
+                            result_df = build_overtime_summary(filtered_df)
                             
                             # 테이블 표시
                             st.markdown("""
@@ -2514,8 +2442,9 @@ def main():
                                 </style>
                             """, unsafe_allow_html=True)
                             
-                            st.dataframe(
+                            render_paged_table(
                                 result_df,
+                                'overtime_table',
                                 column_config={
                                     "이름": st.column_config.TextColumn("이름", width=50),
                                     "초과근무시간 합": st.column_config.TextColumn("초과근무시간 합", width=70),
@@ -2523,29 +2452,133 @@ def main():
                                     "이메일": st.column_config.TextColumn("이메일", width=100)
                                 },
                                 hide_index=False,
-                                use_container_width=True,
-                                height=400
+                                max_height=400
                             )
-                            # 엑셀 다운로드 버튼
-                            output = BytesIO()
-                            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                                result_df.to_excel(writer, sheet_name='초과근무내역', index=True, index_label='No')
-                                # 열 너비 자동 조정
-                                worksheet = writer.sheets['초과근무내역']
-                                worksheet.column_dimensions['B'].width = 10 # 이름
-                                worksheet.column_dimensions['C'].width = 15  # 초과근무시간 합
-                                worksheet.column_dimensions['D'].width = 70  # 초과근무 내역
-                                worksheet.column_dimensions['E'].width = 25  # 이메일
-                            excel_data = output.getvalue()
-                                    
-                            st.download_button(
+                            # 엑셀 다운로드 버튼 (요청 시 생성)
+                            render_export_button(
+                                '초과근무', (selected_month,),
+                                get_data_version(OVERTIME_FILE_PATH),
+                                lambda: convert_overtime_summary_to_excel(result_df),
                                 label="📥 엑셀 파일 다운로드",
-                                data=excel_data,
                                 file_name=f"초과근무내역_{selected_month}.xlsx",
-                                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                                key="overtime_download"
+                            )
+                            render_frame_exports(
+                                '초과근무', (selected_month,),
+                                get_data_version(OVERTIME_FILE_PATH),
+                                lambda: result_df.rename_axis('No').reset_index(), f"초과근무내역_{selected_month}", "overtime_download"
                             )
+
+                            # 본부별 초과근무 내역 일괄 다운로드 (본부마다 엑셀 1개, ZIP으로 묶음)
+                            if '본부' in filtered_df.columns:
+                                render_export_button(
+                                    '초과근무_본부별', (selected_month,),
+                                    get_data_version(OVERTIME_FILE_PATH),
+                                    lambda: build_overtime_bundle(filtered_df, selected_month),
+                                    label="📦 본부별 엑셀 일괄 다운로드 (ZIP)",
+                                    file_name=f"초과근무내역_본부별_{selected_month}.zip",
+                                    mime="application/zip",
+                                    key="overtime_bundle_download"
+                                )
                         else:
                             st.warning("선택한 연월의 데이터가 없습니다.")
+
+                        # 여러 달 추이 (직원 × 연월 행렬, 데이터 버전별 1회 집계)
+                        st.markdown("<br>", unsafe_allow_html=True)
+                        st.markdown("###### 📈 월별 초과근무 추이")
+                        overtime_version = get_data_version(OVERTIME_FILE_PATH)
+                        overtime_matrix, employee_본부, 본부_matrix = build_overtime_matrix(overtime_df, overtime_version)
+                        month_list = list(overtime_matrix.columns)
+
+                        if len(month_list) < 2:
+                            st.info("추이를 보려면 2개월 이상의 데이터가 필요합니다.")
+                        else:
+                            trend_col1, trend_col2 = st.columns([0.7, 0.3])
+                            with trend_col1:
+                                trend_start, trend_end = st.select_slider(
+                                    "조회 기간",
+                                    options=month_list,
+                                    value=(month_list[max(0, len(month_list) - 6)], month_list[-1]),
+                                    key="overtime_trend_range"
+                                )
+                            with trend_col2:
+                                top_n = st.number_input("상위 인원", min_value=5, max_value=50, value=10, step=5, key="overtime_top_n")
+                            trend_months = month_list[month_list.index(trend_start):month_list.index(trend_end) + 1]
+
+                            def build_overtime_trend_chart():
+                                fig = go.Figure()
+                                for 본부, row in 본부_matrix[trend_months].iterrows():
+                                    fig.add_trace(go.Scatter(x=[str(m) for m in trend_months], y=row.round(1), mode='lines+markers', name=str(본부)))
+                                fig.update_layout(
+                                    height=400,
+                                    plot_bgcolor='white',
+                                    yaxis=dict(title="초과근무 (시간)", gridcolor='lightgray', gridwidth=0.5, rangemode='tozero'),
+                                    xaxis=dict(showgrid=False, type='category'),
+                                    margin=dict(t=30),
+                                    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+                                )
+                                return fig
+
+                            if not 본부_matrix.empty:
+                                st.plotly_chart(
+                                    get_cached_figure('초과근무_본부추이', overtime_version, tuple(trend_months), build_overtime_trend_chart),
+                                    use_container_width=True
+                                )
+
+                            top_df, delta_df = build_overtime_leaders(overtime_matrix, employee_본부, trend_months, int(top_n))
+                            leader_col1, leader_col2 = st.columns(2)
+                            with leader_col1:
+                                st.markdown(f"**기간 합계 상위 {int(top_n)}명** ({trend_start} ~ {trend_end})")
+                                st.dataframe(top_df, hide_index=True, use_container_width=True)
+                            with leader_col2:
+                                st.markdown(f"**전월 대비 증가 상위 {int(top_n)}명** ({trend_end})")
+                                if delta_df is None:
+                                    st.info("이전 연월 데이터가 없습니다.")
+                                else:
+                                    st.dataframe(delta_df, hide_index=True, use_container_width=True)
+
+                        # 주 52시간 점검 (직원별 최근 7일 초과근무 합계)
+                        st.markdown("<br>", unsafe_allow_html=True)
+                        st.markdown(f"###### ⚖️ 주 52시간 점검 (최근 7일 초과근무 {OVERTIME_WEEKLY_LIMIT}시간 초과)")
+                        date_column = find_overtime_date_column(overtime_df)
+                        if date_column is None:
+                            st.error(
+                                f"초과근무 데이터에서 근무 날짜 컬럼({', '.join(OVERTIME_DATE_COLUMNS)})을 찾을 수 없어 점검할 수 없습니다. "
+                                f"현재 컬럼: {', '.join(map(str, overtime_df.columns))}"
+                            )
+                        else:
+                            weekly_overtime = build_weekly_overtime(overtime_df, overtime_version, date_column)
+                            if weekly_overtime.empty:
+                                st.info("점검할 초과근무 데이터가 없습니다.")
+                            else:
+                                first_day = weekly_overtime['날짜'].min().date()
+                                last_day = weekly_overtime['날짜'].max().date()
+                                check_col1, check_col2, check_col3 = st.columns([0.2, 0.2, 0.6])
+                                with check_col1:
+                                    check_start = st.date_input(
+                                        "점검 시작일", value=max(first_day, last_day - timedelta(days=90)),
+                                        min_value=first_day, max_value=last_day, key="overtime_check_start"
+                                    )
+                                with check_col2:
+                                    check_end = st.date_input(
+                                        "점검 종료일", value=last_day,
+                                        min_value=first_day, max_value=last_day, key="overtime_check_end"
+                                    )
+                                compliance_df = build_compliance_report(weekly_overtime, check_start, check_end)
+                                if compliance_df.empty:
+                                    st.success(f"{check_start} ~ {check_end} 기간에 기준을 넘은 직원이 없습니다.")
+                                else:
+                                    st.warning(f"{check_start} ~ {check_end} 기간 기준 초과 직원: {len(compliance_df)}명")
+                                    st.dataframe(compliance_df, hide_index=True, use_container_width=True)
+                                    render_export_button(
+                                        '주52시간점검', (check_start, check_end), overtime_version,
+                                        lambda: convert_df_to_excel(compliance_df, sheet_name='주52시간점검'),
+                                        label="📥 점검 결과 다운로드",
+                                        file_name=f"주52시간점검_{check_start.strftime('%Y%m%d')}_{check_end.strftime('%Y%m%d')}.xlsx",
+                                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                                        key="overtime_check_download"
+                                    )
                     else:
                         st.error("데이터에 '연월구분' 컬럼이 없습니다.")
                     
@@ -2560,134 +2593,111 @@ def main():
             col1, col2, col3, col4, col5 = st.columns(5)
             
             with col1:
-                query_date = st.date_input("조회일자", datetime.now())
+                query_date = st.date_input("조회일자", datetime.now(), key="roster_query_date")
             
             with col2:
-                name = st.text_input("성명")
+                name = st.text_input("성명", key="roster_name")
             
             with col3:
                 employment_type = st.selectbox(
                     "고용구분",
-                    ["전체", "정규직", "계약직"]
+                    ["전체", "정규직", "계약직"],
+                    key="roster_employment_type"
                 )
             
             with col4:
                 employment_status = st.selectbox(
                     "재직상태",
-                    ["전체", "재직", "퇴직"]
+                    ["전체", "재직", "퇴직"],
+                    key="roster_employment_status"
                 )
             
             with col5:
-                show_department_history = st.checkbox("해당 시점부서 추가")
-            # 데이터 로드            
-            df, df_history = load_employee_data()
-            
-            # 조회일자 기준으로 재직중인 직원 필터링
-            df = df[
-                (df['입사일'] <= pd.Timestamp(query_date)) &  # 입사일이 조회일자 이전
-                (
-                    (df['퇴사일'].isna()) |  # 퇴사일이 없는 경우
-                    (df['퇴사일'] >= pd.Timestamp(query_date))  # 퇴사일이 조회일자 이후
-                )
-            ]
-            
-            # 조회일자 기준으로 인사발령 데이터 필터링
-            df_history_filtered = df_history[df_history['발령일'] <= pd.Timestamp(query_date)]
-            
-            # 각 직원별 가장 최근 발령 데이터만 선택
-            df_history_filtered = df_history_filtered.sort_values('발령일').groupby('성명').last().reset_index()
-            
-            # 기본 컬럼 설정
-            base_columns = [
-                "사번", "성명", "본부", "팀", "직무", "직위", "직책", "입사일", 
-                "재직기간", "정규직전환일", "고용구분", "재직상태", "생년월일", 
-                "남/여", "만나이", "퇴사일", "휴직상태"
-            ]
-            
-            # 권한에 따른 컬럼 설정
-            additional_columns = ["학력", "최종학교", "전공", "경력사항"]
-            se_columns = base_columns + ([] if check_user_permission(['경영지원']) else additional_columns)
-            
-            history_columns = [
-                "발령일", "구분", "성명", "변경후_본부",  "변경후_팀", "변경후_직책"
-            ]
-            
-            # 재직기간 계산 함수
-            def calculate_employment_period(row):
-                if pd.isna(row['입사일']):
-                    return None
-                
-                start_date = pd.to_datetime(row['입사일'])
-                
-                # 재직상태가 '퇴직'인 경우 퇴사일을 기준으로 계산
-                if row['재직상태'] == '퇴직' and pd.notna(row['퇴사일']):
-                    end_date = pd.to_datetime(row['퇴사일'])
-                else:
-                    # 그 외의 경우 조회일자를 기준으로 계산
-                    end_date = pd.Timestamp(query_date)
-                
-                years = (end_date - start_date).days // 365
-                months = ((end_date - start_date).days % 365) // 30
-                
-                return f"{years}년 {months}개월"
-            
-            # 데이터 필터링
-            if name:
-                df = df[df['성명'].str.contains(name, na=False)]
+                show_department_history = st.checkbox("해당 시점부서 추가", key="roster_show_history")
+
+            # 명부 조회 결과 계산 (데이터 로드 ~ 표시용 데이터)
+            def compute_roster():
+                # 데이터 로드            
+                df, df_history = load_employee_data()
+                df_all = df
+            
+                # 조회일자 기준으로 재직중인 직원 필터링
+                df = df[
+                    (df['입사일'] <= pd.Timestamp(query_date)) &  # 입사일이 조회일자 이전
+                    (
+                        (df['퇴사일'].isna()) |  # 퇴사일이 없는 경우
+                        (df['퇴사일'] >= pd.Timestamp(query_date))  # 퇴사일이 조회일자 이후
+                    )
+                ]
             
-            if employment_type != "전체":
-                df = df[df['고용구분'] == employment_type]
+                # 기본 컬럼 설정
+                base_columns = [
+                    "사번", "성명", "본부", "팀", "직무", "직위", "직책", "입사일", 
+                    "재직기간", "정규직전환일", "고용구분", "재직상태", "생년월일", 
+                    "남/여", "만나이", "퇴사일", "휴직상태"
+                ]
             
-            if employment_status != "전체":
-                df = df[df['재직상태'] == employment_status]
+                # 권한에 따른 컬럼 설정
+                additional_columns = ["학력", "최종학교", "전공", "경력사항"]
+                se_columns = base_columns + ([] if check_user_permission(['경영지원']) else additional_columns)
             
-            # 재직기간 계산
-            df['재직기간'] = df.apply(calculate_employment_period, axis=1)
+                history_columns = [
+                    "발령일", "구분", "성명", "변경후_본부",  "변경후_팀", "변경후_직책"
+                ]
             
-            # 부서 이력 데이터 처리
-            if show_department_history:
-                # 인사발령 데이터와 조인
-                df_merged = pd.merge(
-                    df, 
-                    df_history_filtered, 
-                    left_on='성명', 
-                    right_on='성명', 
-                    how='left',
-                    suffixes=('', '_history')  # 중복 컬럼에 접미사 추가
-                )
-                
-                # 발령이 없는 경우 기본값 설정
-                df_merged['변경후_본부'] = df_merged['변경후_본부'].fillna(df_merged['본부'])
-                df_merged['변경후_팀'] = df_merged['변경후_팀'].fillna(df_merged['팀'])
-                df_merged['변경후_직책'] = df_merged['변경후_직책'].fillna(df_merged['직책'])
-                
-                # 컬럼 순서 조정
-                display_columns = se_columns + [col for col in history_columns if col not in se_columns]
-                df_display = df_merged[display_columns]
-            else:
-                df_display = df[se_columns]
+                # 데이터 필터링
+                if name:
+                    df = filter_by_name(df, name, build_name_index(df_all['성명'], (get_data_version(), '명부')))
             
-            # 데이터 표시
-            df_display = df_display.reset_index(drop=True)
-            df_display.index = df_display.index + 1
-            df_display = df_display.reset_index()
-            df_display = df_display.rename(columns={'index': 'No'})
+                if employment_type != "전체":
+                    df = df[df['고용구분'] == employment_type]
             
-            # 날짜 컬럼의 시간 제거
-            date_columns = ['정규직전환일', '입사일', '퇴사일', '생년월일', '발령일']
-            for col in date_columns:
-                if col in df_display.columns:
-                    df_display[col] = pd.to_datetime(df_display[col]).dt.date
+                if employment_status != "전체":
+                    df = df[df['재직상태'] == employment_status]
             
-            # 데이터 수에 따라 높이 동적 조정 (행당 35픽셀)
-            row_height = 35  # 각 행의 예상 높이
-            dynamic_height = min(len(df_display) * row_height + 40, 600)  # 헤더 높이 추가, 최대 600픽셀로 제한
+                # 재직기간 계산 (벡터 연산)
+                df['재직기간'] = format_employment_period(df, query_date)
             
-            st.dataframe(
+                # 부서 이력 데이터 처리
+                if show_department_history:
+                    # 조회일자 시점의 조직 상태를 사번 기준으로 조인 (월말 스냅샷 + 이후 발령 재생)
+                    history_key = '사번' if '사번' in df.columns and '사번' in df_history.columns else '성명'
+                    org_snapshots = build_org_snapshots(df_history, get_data_version(), history_key)
+                    df_merged = attach_org_as_of(df, org_snapshots, query_date)
+                
+                    # 발령이 없는 경우 기본값 설정
+                    df_merged['변경후_본부'] = df_merged['변경후_본부'].fillna(df_merged['본부'])
+                    df_merged['변경후_팀'] = df_merged['변경후_팀'].fillna(df_merged['팀'])
+                    df_merged['변경후_직책'] = df_merged['변경후_직책'].fillna(df_merged['직책'])
+                
+                    # 컬럼 순서 조정
+                    display_columns = se_columns + [col for col in history_columns if col not in se_columns]
+                    df_display = df_merged[display_columns]
+                else:
+                    df_display = df[se_columns]
+            
+                # 데이터 표시
+                df_display = df_display.reset_index(drop=True)
+                df_display.index = df_display.index + 1
+                df_display = df_display.reset_index()
+                df_display = df_display.rename(columns={'index': 'No'})
+            
+                # 날짜 컬럼의 시간 제거
+                date_columns = ['정규직전환일', '입사일', '퇴사일', '생년월일', '발령일']
+                for col in date_columns:
+                    if col in df_display.columns:
+                        df_display[col] = pd.to_datetime(df_display[col]).dt.date
+
+                return df_display
+
+            # 조회 조건(위젯 값)·데이터 버전·권한이 같으면 이전 결과 재사용
+            roster_version = (get_data_version(), check_user_permission(['경영지원']))
+            df_display = get_section_result('임직원명부_조회', roster_version, compute_roster)
+
+            # 현재 페이지만 표시 (높이는 행당 35픽셀, 최대 600픽셀)
+            render_paged_table(
                 df_display,
-                use_container_width=True,
-                hide_index=True,
-                height=dynamic_height,
+                'roster_table',
                 column_config={
                    "직무": st.column_config.Column(width=70),
                    "최종학교": st.column_config.Column(width=70),
@@ -2696,15 +2706,18 @@ def main():
                 }
             )
             
-            # 엑셀 다운로드 버튼
-
-            
-            excel_data = convert_df_to_excel(df_display)
-            st.download_button(
+            # 엑셀 다운로드 버튼 (요청 시 생성)
+            render_export_button(
+                '임직원명부', (query_date, name, employment_type, employment_status, show_department_history),
+                roster_version, lambda: convert_df_to_excel(df_display),
                 label="📥 엑셀 다운로드",
-                data=excel_data,
                 file_name=f"임직원명부_{query_date.strftime('%Y%m%d')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                key="roster_download"
+            )
+            render_frame_exports(
+                '임직원명부', (query_date, name, employment_type, employment_status, show_department_history),
+                roster_version, lambda: df_display, f"임직원명부_{query_date.strftime('%Y%m%d')}", "roster_download"
             )
 
         elif menu == "📅 인사발령 내역":
@@ -2767,7 +2780,8 @@ def main():
                     filtered_df = filtered_df[filtered_df['발령일'].dt.year == selected_year]
                 
                 if name:
-                    filtered_df = filtered_df[filtered_df['성명'].str.contains(name, na=False)]
+                    name_index = build_name_index(df_promotion['성명'], (get_data_version(), '인사발령'))
+                    filtered_df = filter_by_name(filtered_df, name, name_index)
                 
                 if selected_types:
                     filtered_df = filtered_df[filtered_df['구분'].isin(selected_types)]
@@ -2792,39 +2806,28 @@ def main():
                 
                 # 데이터프레임 표시
                 if not filtered_df.empty:
-                    # 데이터 정렬 및 인덱스 설정
-                    display_df = filtered_df[display_columns].sort_values('발령일', ascending=False).reset_index(drop=True)
-                    display_df.index = display_df.index + 1  # 인덱스를 1부터 시작하도록 설정
-                    
-                    # 발령일 컬럼의 시간 제거
-                    display_df['발령일'] = pd.to_datetime(display_df['발령일']).dt.strftime('%Y-%m-%d')
-                    
-                    # 데이터 수에 따라 높이 동적 조정 (행당 35픽셀)
-                    row_height = 35  # 각 행의 예상 높이
-                    dynamic_height = min(len(display_df) * row_height + 40, 600)  # 헤더 높이 추가, 최대 600픽셀로 제한
-                    
-                    st.dataframe(
-                        display_df,
-                        use_container_width=True,
-                        height=dynamic_height
-                    )
+                    # 발령일 내림차순으로 정렬된 표에서 현재 페이지만 표시
+                    render_paged_table(df_display, 'promotion_table')
                 else:
                     st.warning("조회된 데이터가 없습니다.")
                 
-                # 엑셀 다운로드 버튼
-                # 전역 함수 사용
-                
-                excel_data = convert_df_to_excel(df_display)
-                st.download_button(
+                # 엑셀 다운로드 버튼 (요청 시 생성)
+                render_export_button(
+                    '인사발령내역', (selected_year, name, selected_types), get_data_version(),
+                    lambda: convert_df_to_excel(df_display),
                     label="📥 엑셀 다운로드",
-                    data=excel_data,
                     file_name=f"인사발령내역_{selected_year}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    key="promotion_download"
+                )
+                render_frame_exports(
+                    '인사발령내역', (selected_year, name, selected_types), get_data_version(),
+                    lambda: df_display, f"인사발령내역_{selected_year}", "promotion_download"
                 )
 
         elif menu == "🔔 인사팀 업무 공유":
             st.markdown("##### 🔔 인사팀 업무 공유")
-            # 업무보고 데이터 가져오기
+            # 업무보고 데이터 가져오기 (반환: 데이터, 가져온 시각 - 표 HTML 캐시 키로 사용)
             @st.cache_data(ttl=60)  # 1분마다 캐시 갱신
             def get_work_report_data():
                 try:
@@ -2850,7 +2853,7 @@ def main():
                         worksheet = gc.open_by_key(sheet_id).worksheet('시트1')  # '업무보고' 시트 선택
                     except Exception as e:
                         st.error(f"시트 접근 중 오류 발생: {str(e)}")
-                        return pd.DataFrame()
+                        return pd.DataFrame(), None
                     
                     try:
                         # 데이터 가져오기
@@ -2863,17 +2866,17 @@ def main():
                         if '보고일' in df.columns:
                             df['보고일'] = pd.to_datetime(df['보고일'])
                         
-                        return df
+                        return df, datetime.now().isoformat()
                     except Exception as e:
                         st.error(f"데이터 처리 중 오류 발생: {str(e)}")
-                        return pd.DataFrame()
+                        return pd.DataFrame(), None
                         
                 except Exception as e:
                     st.error(f"인증 중 오류 발생: {str(e)}")
-                    return pd.DataFrame()
+                    return pd.DataFrame(), None
 
             # 업무보고 데이터 로드
-            report_df = get_work_report_data()
+            report_df, report_version = get_work_report_data()
             st.markdown("<br>", unsafe_allow_html=True)
             if not report_df.empty:
                 st.markdown("###### 업무 공유/보고")
@@ -2922,48 +2925,18 @@ def main():
                 filtered_df = filtered_df.sort_values('보고일', ascending=False)
 
                 if not filtered_df.empty:
-                    html_output = []
-                    html_output.append('<table style="width: 70%;">')
-                    
-                    for _, row in filtered_df.iterrows():
-                        html_output.append("<tr>")
-                        # 업무구분 
-                        html_output.append(f'<td style="width: 20%; text-align: left; background-color: #f0f2f6; font-size: 13px;""> {row["업무구분"]}</td>')
-                        # 업무내용
-                        업무내용 = row["업무내용"]
-                        if not 업무내용.startswith("<"):
-                            # 여러 줄 지원 및 URL 자동 링크 변환
-                            업무내용 = 업무내용.replace("\n", "<br>")
-                            # URL 패턴 찾기
-                            url_pattern = r'https?://[^\s<>"]+|www\.[^\s<>"]+'
-                            # "링크" 텍스트 찾기
-                            link_pattern = r'링크' 
-                            
-                            # URL이 있는지 확인
-                            urls = re.findall(url_pattern, 업무내용)
-                            if urls:
-                                # 각 URL에 대해
-                                for url in urls:
-                                    # "링크" 텍스트가 있으면 해당 텍스트를 URL로 대체
-                                    if re.search(link_pattern, 업무내용):
-                                        업무내용 = re.sub(link_pattern, f'<a href="{url}" target="_blank">링크</a>', 업무내용, count=1)
-                                    else:
-                                        # "링크" 텍스트가 없으면 URL 자체를 링크로 변환
-                                        업무내용 = 업무내용.replace(url, f'<a href="{url}" target="_blank">링크</a>')
-                        
-                        html_output.append(f'<td style="width: 85%; text-align: left; padding-left: 15px; font-size: 13px;">{업무내용}</td>')
-                        html_output.append("</tr>")
-                    
-                    html_output.append("</table>")
-                    
                     # HTML 출력
-                    final_html = "\n".join(html_output)
+                    final_html = render_work_report_html(
+                        filtered_df, report_version, selected_status, selected_type_date
+                    )
                     st.markdown(final_html, unsafe_allow_html=True)
                 else:
                     st.info("조회된 데이터가 없습니다.")
             
             
-            try:
+            # 주요일정 데이터 가져오기 (반환: 시트 값 목록, 가져온 시각 - 표 HTML 캐시 키로 사용)
+            @st.cache_data(ttl=60)  # 1분마다 캐시 갱신
+            def get_schedule_data():
                 # 구글 시트 인증
                 scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
                 credentials_dict = {
@@ -2989,7 +2962,11 @@ def main():
                 except Exception as e:
                     st.error(f"시트 접근 중 오류 발생: {str(e)}")
                     schedule_data = []
-                
+                return schedule_data, datetime.now().isoformat()
+
+            try:
+                schedule_data, schedule_version = get_schedule_data()
+
                 # 데이터가 있는 경우에만 DataFrame 생성
                 if schedule_data:
                     # 데이터프레임으로 변환
@@ -3050,40 +3027,10 @@ def main():
                     # HTML 테이블 생성
                     table_html = '<div class="schedule-container">'
                     table_html += '<div style="margin-bottom: 10px; font-weight: bold;">연간 주요일정</div>'
-                    table_html += '<table class="schedule-table">'
-                    
-                    # 헤더 행 추가
-                    table_html += '<tr><th style="color: #000000; background-color: #f0f2f6; font-weight: normal;">구분</th>'
-                    for col in schedule_df.columns[1:]:
-                        table_html += f'<th style="color: #000000; background-color: #f0f2f6; font-weight: normal;">{col}</th>'
-                    table_html += '</tr>'
-                    
-                    # 데이터 행 추가
-                    for _, row in schedule_df.iterrows():
-                        table_html += '<tr>'
-                        current_month = int(datetime.now().month)  # 현재 월을 정수형으로 가져오기
-                        for idx, col in enumerate(schedule_df.columns):
-                            cell_value = row[col]
-                            if idx == 0:  # 첫 번째 열(구분)
-                                table_html += f'<td style="background-color: #f0f2f6; text-align: center; color: #000000;">{cell_value}</td>'
-                            else:
-                                # 현재 월에 해당하는 열인지 확인 (1월은 첫 번째 열이므로 idx가 1)
-                                is_current_month = (idx == current_month)
-                                
-                                if is_current_month and cell_value and cell_value != "":
-                                    # 현재 월이고 내용이 있는 경우 빨간 배경과 흰색 글씨
-                                    table_html += f'<td style="background-color: #ff3333; text-align: center; color: #FFFFFF;">{cell_value}</td>'
-                                elif "진행" in str(cell_value).lower():
-                                    table_html += f'<td style="background-color: #FFE5E5; text-align: center; color: #EE6C6C;">{cell_value}</td>'
-                                elif "계획" in str(cell_value).lower():
-                                    table_html += f'<td style="background-color: #F2F2F2; text-align: center; color: #A6A6A6;">{cell_value}</td>'
-                                elif cell_value and cell_value != "":  # 그 외 텍스트가 있는 경우
-                                    table_html += f'<td style="background-color: #FFE5E6; text-align: center; color: #EE6C6C;">{cell_value}</td>'
-                                else:
-                                    table_html += f'<td style="text-align: center; color: #A6A6A6;">{cell_value}</td>'
-                        table_html += '</tr>'
-                    
-                    table_html += '</table></div>'
+                    table_html += render_schedule_html(
+                        schedule_df, schedule_version, int(datetime.now().month)
+                    )
+                    table_html += '</div>'
                     
                     # 테이블 표시
                     st.markdown(table_html, unsafe_allow_html=True)
@@ -3434,32 +3381,37 @@ def main():
                     # 본부명 기준으로 내림차순 정렬
                     dept_to_df = dept_to_df.sort_values('본부', ascending=False)
                     
-                    # 수평 막대 차트 생성
-                    fig_to = px.bar(
-                        dept_to_df,
-                        y='본부',
-                        x='TO',
-                        orientation='h',
-                        title=""  # 제목 제거
-                    )
+                    def build_to_chart():
+                        # 수평 막대 차트 생성
+                        fig_to = px.bar(
+                            dept_to_df,
+                            y='본부',
+                            x='TO',
+                            orientation='h',
+                            title=""  # 제목 제거
+                        )
                     
-                    # 차트 스타일 설정
-                    fig_to.update_traces(
-                        marker_color='#FF4B4B',
-                        text=dept_to_df['TO'],
-                        textposition='outside'
-                    )
+                        # 차트 스타일 설정
+                        fig_to.update_traces(
+                            marker_color='#FF4B4B',
+                            text=dept_to_df['TO'],
+                            textposition='outside'
+                        )
                     
-                    fig_to.update_layout(
-                        height=280,
-                        showlegend=False,
-                        margin=dict(t=30, r=20, l=20),  # 상단 여백
-                        xaxis_title="",
-                        yaxis_title="",
-                        yaxis=dict(autorange="reversed")  # 위에서 아래로 정렬
-                    )
+                        fig_to.update_layout(
+                            height=280,
+                            showlegend=False,
+                            margin=dict(t=30, r=20, l=20),  # 상단 여백
+                            xaxis_title="",
+                            yaxis_title="",
+                            yaxis=dict(autorange="reversed")  # 위에서 아래로 정렬
+                        )
                     
-                    # 차트 표시
+                        # 차트 표시
+                        return fig_to
+
+                    # 데이터 버전·조회 조건별 캐시된 차트 사용
+                    fig_to = get_cached_figure('채용현황_본부별TO', get_data_version("General/00_2. HRmate/임직원 기초 데이터.xlsx"), (selected_year, selected_status), build_to_chart)
                     st.plotly_chart(fig_to, use_container_width=True)
                 
                 with col3:
@@ -3608,13 +3560,14 @@ def main():
             st.markdown("---")
             st.markdown("##### 💡 지원자 접수 통계")
             
+            # 현재 디렉토리의 엑셀 파일 경로
+            applicant_file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "임직원 기초 데이터.xlsx")
+
             # 지원자 통계 데이터 로드
             @st.cache_data
             def load_applicant_stats():
                 try:
-                    # 현재 디렉토리에서 엑셀 파일 경로 설정
-                    current_dir = os.path.dirname(os.path.abspath(__file__))
-                    file_path = os.path.join(current_dir, "임직원 기초 데이터.xlsx")
+                    file_path = applicant_file_path
                     
                     
                     # 파일 존재 여부 확인
@@ -3710,6 +3663,8 @@ def main():
 
             # 데이터 로드
             applicant_df = load_applicant_stats()
+            # 그래프 캐시 키는 파일 수정 시각 사용
+            applicant_version = os.path.getmtime(applicant_file_path) if os.path.exists(applicant_file_path) else None
             
             if applicant_df is not None and len(applicant_df) > 0:
                 # 연도 선택
@@ -3727,33 +3682,37 @@ def main():
                     # 접수방법 순서 정의
                     channel_order = ['뉴로핏커리어', '사내추천', '원티드', '헤드헌팅', '점핏', '인재서치', '기타']
                     
-                    # 접수방법별 카운트
-                    channel_stats = year_df['접수방법'].value_counts().reindex(channel_order).fillna(0)
-                    total_channel = channel_stats.sum()
-                    # 차트 생성
-                    fig_channel = px.bar(
-                        x=channel_stats.index,
-                        y=channel_stats.values,
-                        labels={'x': '', 'y': '지원자 수'},
-                        title=f"{selected_year}년 접수방법별 지원자 현황 (총 {int(total_channel):,}명)"
-                    )
-                    
-                    # 차트 스타일 설정
-                    colors = ['#FF4B4B' if x == '뉴로핏커리어' else '#FFB6B6' for x in channel_stats.index]
-                    fig_channel.update_traces(marker_color=colors)
-                    # 막대 위에 값 표시 추가
-                    fig_channel.update_traces(
-                        text=channel_stats.values.astype(int),
-                        textposition='outside'
-                    )
-                    fig_channel.update_layout(
-                        showlegend=False,
-                        height=450,
-                        title_x=0,
-                        title_y=0.95,
-                        margin=dict(t=70)  # 상단 여백을 더 크게 증가
-                    )
+                    def build_channel_chart():
+                        # 접수방법별 카운트
+                        channel_stats = year_df['접수방법'].value_counts().reindex(channel_order).fillna(0)
+                        total_channel = channel_stats.sum()
+                        # 차트 생성
+                        fig_channel = px.bar(
+                            x=channel_stats.index,
+                            y=channel_stats.values,
+                            labels={'x': '', 'y': '지원자 수'},
+                            title=f"{selected_year}년 접수방법별 지원자 현황 (총 {int(total_channel):,}명)"
+                        )
                     
+                        # 차트 스타일 설정
+                        colors = ['#FF4B4B' if x == '뉴로핏커리어' else '#FFB6B6' for x in channel_stats.index]
+                        fig_channel.update_traces(marker_color=colors)
+                        # 막대 위에 값 표시 추가
+                        fig_channel.update_traces(
+                            text=channel_stats.values.astype(int),
+                            textposition='outside'
+                        )
+                        fig_channel.update_layout(
+                            showlegend=False,
+                            height=450,
+                            title_x=0,
+                            title_y=0.95,
+                            margin=dict(t=70)  # 상단 여백을 더 크게 증가
+                        )
+                        return fig_channel
+
+                    # 데이터 버전·조회연도별 캐시된 차트 사용
+                    fig_channel = get_cached_figure('채용현황_접수방법별', applicant_version, (selected_year,), build_channel_chart)
                     # 차트 표시
                     st.plotly_chart(fig_channel, use_container_width=True)
                 with col2:
@@ -3769,41 +3728,45 @@ def main():
                         '서류불합격', '1차면접불합격', '2차면접불합격', '면접불참',  '보류', '연락안됨'
                     ]
                     
-                    # 전형결과별 카운트
-                    result_stats = year_df['전형 결과'].value_counts().reindex(result_order).fillna(0)
-                    total = result_stats.sum()
-                    
-                    # '합계' 항목 제외
-                    result_stats = result_stats[result_stats.index != '합계']
+                    def build_result_chart():
+                        # 전형결과별 카운트
+                        result_stats = year_df['전형 결과'].value_counts().reindex(result_order).fillna(0)
+                        total = result_stats.sum()
                     
-                    # 차트 생성
-                    fig_result = px.bar(
-                        x=result_stats.values,
-                        y=result_stats.index,
-                        orientation='h',  # 수평 방향으로 변경
-                        labels={'x': '지원자 수', 'y': ''},
-                        title=f"{selected_year}년 전형결과별 현황 (총 {int(total):,}명)"
-                    )
+                        # '합계' 항목 제외
+                        result_stats = result_stats[result_stats.index != '합계']
                     
-                    # 차트 스타일 설정
-                    colors = ['#FF4B4B' if x in ['[5]최종합격', '입사포기'] else '#FFB6B6' for x in result_stats.index]
-                    fig_result.update_traces(
-                        marker_color=colors,
-                        text=result_stats.values.astype(int),
-                        textposition='outside'
-                    )
+                        # 차트 생성
+                        fig_result = px.bar(
+                            x=result_stats.values,
+                            y=result_stats.index,
+                            orientation='h',  # 수평 방향으로 변경
+                            labels={'x': '지원자 수', 'y': ''},
+                            title=f"{selected_year}년 전형결과별 현황 (총 {int(total):,}명)"
+                        )
                     
-                    fig_result.update_layout(
-                        height=600,
-                        showlegend=False,
-                        title_x=0,
-                        title_y=0.95,
-                        margin=dict(t=70, r=20, l=20),
-                        xaxis_title="",
-                        yaxis_title="",
-                        yaxis=dict(autorange="reversed")  # 위에서 아래로 정렬
-                    )
+                        # 차트 스타일 설정
+                        colors = ['#FF4B4B' if x in ['[5]최종합격', '입사포기'] else '#FFB6B6' for x in result_stats.index]
+                        fig_result.update_traces(
+                            marker_color=colors,
+                            text=result_stats.values.astype(int),
+                            textposition='outside'
+                        )
                     
+                        fig_result.update_layout(
+                            height=600,
+                            showlegend=False,
+                            title_x=0,
+                            title_y=0.95,
+                            margin=dict(t=70, r=20, l=20),
+                            xaxis_title="",
+                            yaxis_title="",
+                            yaxis=dict(autorange="reversed")  # 위에서 아래로 정렬
+                        )
+                        return fig_result
+
+                    # 데이터 버전·조회연도별 캐시된 차트 사용
+                    fig_result = get_cached_figure('채용현황_전형결과별', applicant_version, (selected_year,), build_result_chart)
                     # 차트 표시
                     st.plotly_chart(fig_result, use_container_width=True)
                 
@@ -3828,142 +3791,138 @@ def main():
             
             if uploaded_file is not None:
                 try:
-                    # 엑셀 파일 읽기
-                    stock_option_info = pd.read_excel(uploaded_file, sheet_name='스톡옵션안내')
-                    stock_option_code = pd.read_excel(uploaded_file, sheet_name='ST코드')
+                    def compute_stock_options():
+                        """업로드 파일에서 재직자별 스톡옵션 내역과 다운로드용 엑셀 데이터를 만드는 함수"""
+                        # 엑셀 파일 읽기
+                        stock_option_info = pd.read_excel(uploaded_file, sheet_name='스톡옵션안내')
+                        stock_option_code = pd.read_excel(uploaded_file, sheet_name='ST코드')
                     
-                    # 컬럼명을 문자열로 변환
-                    stock_option_info.columns = stock_option_info.columns.astype(str)
-                    stock_option_code.columns = stock_option_code.columns.astype(str)
+                        # 컬럼명을 문자열로 변환
+                        stock_option_info.columns = stock_option_info.columns.astype(str)
+                        stock_option_code.columns = stock_option_code.columns.astype(str)
                     
-                    # 재직 중인 직원만 필터링
-                    stock_option_info['재직상태'] = stock_option_info['재직상태'].fillna('').astype(str)
-                    active_employees = stock_option_info[~stock_option_info['재직상태'].str.contains('퇴직', na=False)]
+                        # 재직 중인 직원만 필터링
+                        stock_option_info['재직상태'] = stock_option_info['재직상태'].fillna('').astype(str)
+                        active_employees = stock_option_info[~stock_option_info['재직상태'].str.contains('퇴직', na=False)]
                     
-                    # 결과를 저장할 리스트
-                    result_data = []
+                        # 결과를 저장할 리스트
+                        result_data = []
                     
-                    # L열(12번째 컬럼)부터의 ST 코드 컬럼들
-                    st_columns = active_employees.columns[11:] 
+                        # L열(12번째 컬럼)부터의 ST 코드 컬럼들
+                        st_columns = active_employees.columns[11:] 
                     
-                    # 각 직원에 대해 처리
-                    for _, employee in active_employees.iterrows():
-                        employee_info = {
-                            '성명': str(employee.get('성명', '')),
-                            '재직상태': str(employee.get('재직상태', '')),
-                            '본부': str(employee.get('본부', '')),
-                            '팀': str(employee.get('팀', '')),
-                            '직책': str(employee.get('직책', '')),
-                            '합계': 0,
-                            '스톡옵션내역': []
-                        }
+                        # 각 직원에 대해 처리
+                        for _, employee in active_employees.iterrows():
+                            employee_info = {
+                                '성명': str(employee.get('성명', '')),
+                                '재직상태': str(employee.get('재직상태', '')),
+                                '본부': str(employee.get('본부', '')),
+                                '팀': str(employee.get('팀', '')),
+                                '직책': str(employee.get('직책', '')),
+                                '합계': 0,
+                                '스톡옵션내역': []
+                            }
                          
-                        # ST 코드별 스톡옵션 처리
-                        for col in st_columns:
-                            try:
-                                # 스톡옵션 수량이 있는 경우만 처리
-                                quantity = pd.to_numeric(employee[col], errors='coerce')
-                                if pd.isna(quantity) or quantity <= 0:
-                                    continue
+                            # ST 코드별 스톡옵션 처리
+                            for col in st_columns:
+                                try:
+                                    # 스톡옵션 수량이 있는 경우만 처리
+                                    quantity = pd.to_numeric(employee[col], errors='coerce')
+                                    if pd.isna(quantity) or quantity <= 0:
+                                        continue
                                 
-                                # ST 코드 정보 찾기
-                                st_code_info = stock_option_code[stock_option_code['회차구분'].astype(str) == str(col)]
-                                if st_code_info.empty:
-                                    continue
+                                    # ST 코드 정보 찾기
+                                    st_code_info = stock_option_code[stock_option_code['회차구분'].astype(str) == str(col)]
+                                    if st_code_info.empty:
+                                        continue
                                 
-                                st_info = st_code_info.iloc[0]
+                                    st_info = st_code_info.iloc[0]
                                 
-                                # 날짜 처리
-                                start_date = pd.to_datetime(st_info['행사시작일'], errors='coerce')
-                                end_date = pd.to_datetime(st_info['행사종료일'], errors='coerce')
+                                    # 날짜 처리
+                                    start_date = pd.to_datetime(st_info['행사시작일'], errors='coerce')
+                                    end_date = pd.to_datetime(st_info['행사종료일'], errors='coerce')
                                 
-                                start_date_str = start_date.strftime('%Y-%m-%d') if pd.notna(start_date) else '날짜 없음'
-                                end_date_str = end_date.strftime('%Y-%m-%d') if pd.notna(end_date) else '날짜 없음'
+                                    start_date_str = start_date.strftime('%Y-%m-%d') if pd.notna(start_date) else '날짜 없음'
+                                    end_date_str = end_date.strftime('%Y-%m-%d') if pd.notna(end_date) else '날짜 없음'
                                 
-                                # 행사금액과 행사가능비율 처리
-                                exercise_price = pd.to_numeric(st_info.get('행사금액', 0), errors='coerce')
-                                exercise_ratio = pd.to_numeric(st_info.get('행사가능 비율', 0), errors='coerce')
+                                    # 행사금액과 행사가능비율 처리
+                                    exercise_price = pd.to_numeric(st_info.get('행사금액', 0), errors='coerce')
+                                    exercise_ratio = pd.to_numeric(st_info.get('행사가능 비율', 0), errors='coerce')
                                 
-                                option_info = {
-                                    '구분': str(st_info.get('구분', '')),
-                                    '회차': str(col),
-                                    '행사기간': f"{start_date_str}~{end_date_str}",
-                                    '행사가능비율': f"{int(exercise_ratio * 100)}%",
-                                    '행사금액': f"{int(exercise_price):,}원",
-                                    '부여주식': f"{int(quantity):,}주",
-                                    '금액합계': f"{int(exercise_price * quantity):,}원"
-                                }
+                                    option_info = {
+                                        '구분': str(st_info.get('구분', '')),
+                                        '회차': str(col),
+                                        '행사기간': f"{start_date_str}~{end_date_str}",
+                                        '행사가능비율': f"{int(exercise_ratio * 100)}%",
+                                        '행사금액': f"{int(exercise_price):,}원",
+                                        '부여주식': f"{int(quantity):,}주",
+                                        '금액합계': f"{int(exercise_price * quantity):,}원"
+                                    }
                                 
-                                employee_info['스톡옵션내역'].append(option_info)
-                                employee_info['합계'] += quantity
+                                    employee_info['스톡옵션내역'].append(option_info)
+                                    employee_info['합계'] += quantity
                                 
-                            except Exception as e:
-                                st.warning(f"데이터 처리 중 오류: {str(e)}")
-                                continue
+                                except Exception as e:
+                                    st.warning(f"데이터 처리 중 오류: {str(e)}")
+                                    continue
                         
-                        if employee_info['스톡옵션내역']:
-                            result_data.append(employee_info)
+                            if employee_info['스톡옵션내역']:
+                                result_data.append(employee_info)
                     
-                    # 결과 데이터프레임 생성
-                    if result_data:
+                        # 결과 데이터프레임 생성
+                        if not result_data:
+                            return None
                         df = pd.DataFrame(result_data)
                         
                         # "합계" 행 제외
                         df = df[df['성명'] != '합계']
                         
-                        # 엑셀 다운로드를 위한 데이터 준비
-                        excel_data = []
-                        for _, row in df.iterrows():
-                            # 기본 정보 행
-                            basic_info = f"{row['성명']} ({row['본부']} / {row['팀']} / {row['직책']})"
+                        return df
+
+                    def build_stock_option_table():
+                        """재직자별 스톡옵션 내역을 다운로드용 표(임직원 정보/총계/상세내역)로 만드는 함수"""
+                        # 엑셀 다운로드용 데이터프레임 생성
+                        download_data = []
                             
-                            # 총계 정보 행
+                        for _, row in df.iterrows():
                             total_amount = sum(int(option['금액합계'].replace('원', '').replace(',', '')) for option in row['스톡옵션내역'])
-                            total_info = f"총 행사가능 주식수: {int(row['합계']):,}주 | 총 행사가액: {total_amount:,}원"
-                            
-                            # 스톡옵션 상세 내역
-                            stock_options = []
+                                
+                            # 스톡옵션 상세 내역 문자열 생성
+                            details = []
                             current_group = None
+                                
                             for option in row['스톡옵션내역']:
                                 if option['구분'] != current_group:
-                                    if current_group is not None:
-                                        excel_data.append(['', '', ''])  # 구분 사이 빈 줄 추가
-                                    stock_options.append(f"[부여코드: {option['구분']}]")
+                                    details.append(f"\n[부여코드: {option['구분']}]")
                                     current_group = option['구분']
-                                
-                                option_detail = (
-                                    f"행사코드: {option['회차']}, "
-                                    f"행사기간: {option['행사기간']}, "
-                                    f"행사비율: {option['행사가능비율']}, "
-                                    f"행사가능 주식수: {option['부여주식']}, "
-                                    f"주당 행사가액: {option['행사금액']}, "
-                                    f"행사가액 합계: {option['금액합계']}"
+                                    
+                                details.append(
+                                    f"행사코드: {option['회차']}  "
+                                    f"행사기간: {option['행사기간']}  "
+                                    f"행사가능 주식수: {option['부여주식']}  "
+                                    f"주당 행사가액: {option['행사금액']}  "
                                 )
-                                stock_options.append(option_detail)
-                            
-                            # 첫 번째 행 추가
-                            excel_data.append([basic_info, total_info, stock_options[0] if stock_options else ''])
-                            
-                            # 나머지 스톡옵션 정보 행 추가
-                            for option_info in stock_options[1:]:
-                                excel_data.append(['', '', option_info])
+                                
+                            download_data.append({
+                                '임직원 정보': f"{row['성명']} ({row['본부']} / {row['팀']} / {row['직책']})",
+                                '총계': f"총 행사가능 주식수: {int(row['합계']):,}주 | 총 행사가액: {total_amount:,}원",
+                                '스톡옵션 상세내역': '\n'.join(details)
+                            })
                             
-                            # 직원 사이 구분선 추가
-                            excel_data.append(['', '', ''])
-                        
-                        # 데이터프레임 생성
-                        excel_df = pd.DataFrame(excel_data, columns=['기본정보', '총계정보', '스톡옵션 상세'])
-                        
-                        # 엑셀 파일로 변환
+                        return pd.DataFrame(download_data)
+
+                    def build_stock_option_excel():
+                        """재직자별 스톡옵션 내역을 다운로드용 엑셀 데이터로 만드는 함수"""
+                        # 데이터프레임 생성 및 엑셀 변환
+                        download_df = build_stock_option_table()
                         buffer = io.BytesIO()
-                        with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
-                            excel_df.to_excel(writer, sheet_name='스톡옵션현황', index=False)
                             
-                            # 워크북과 워크시트 가져오기
+                        with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
+                            download_df.to_excel(writer, index=False, sheet_name='스톡옵션현황')
                             workbook = writer.book
                             worksheet = writer.sheets['스톡옵션현황']
-                            
-                            # 셀 포맷 정의
+                                
+                            # 포맷 설정
                             header_format = workbook.add_format({
                                 'bold': True,
                                 'bg_color': '#D9D9D9',
@@ -3971,136 +3930,80 @@ def main():
                                 'align': 'center',
                                 'valign': 'vcenter'
                             })
-                            
+                                
                             cell_format = workbook.add_format({
                                 'align': 'left',
                                 'valign': 'vcenter',
                                 'text_wrap': True
                             })
-                            
+                                
                             # 열 너비 설정
-                            worksheet.set_column('A:A', 40)  # 기본정보
-                            worksheet.set_column('B:B', 40)  # 총계정보
-                            worksheet.set_column('C:C', 80)  # 스톡옵션 상세
-                            
+                            worksheet.set_column('A:A', 40)
+                            worksheet.set_column('B:B', 40)
+                            worksheet.set_column('C:C', 80)
+                                
+                            # 행 높이 설정
+                            worksheet.set_default_row(30)
+                                
                             # 헤더 포맷 적용
-                            for col_num, value in enumerate(excel_df.columns.values):
+                            for col_num, value in enumerate(download_df.columns.values):
                                 worksheet.write(0, col_num, value, header_format)
-                            
+                                
                             # 데이터 포맷 적용
-                            for row_num in range(len(excel_df)):
-                                for col_num in range(len(excel_df.columns)):
-                                    worksheet.write(row_num + 1, col_num, excel_df.iloc[row_num, col_num], cell_format)
-                            
-                            # 검색 기능 추가
-                            search_name = st.text_input('이름으로 검색', '', key='stock_option_search')
+                            for row_num in range(len(download_df)):
+                                for col_num in range(len(download_df.columns)):
+                                    worksheet.write(row_num + 1, col_num, download_df.iloc[row_num, col_num], cell_format)
+
+                        return buffer.getvalue()
+
+                    # 업로드 파일 내용이 같으면 이전 계산 결과 재사용
+                    file_version = hashlib.md5(uploaded_file.getvalue()).hexdigest()
+                    df = get_section_result('스톡옵션_현황', file_version, compute_stock_options)
+
+                    if df is not None:
+                        # 검색 기능 추가
+                        search_name = st.text_input('이름으로 검색', '', key='stock_option_search')
+
+                        # 다운로드 버튼 배치 (요청 시 생성)
+                        render_export_button(
+                            '스톡옵션', (), file_version, build_stock_option_excel,
+                            label="📥 전체 스톡옵션 현황 다운로드",
+                            file_name="스톡옵션_전체현황.xlsx",
+                            mime="application/vnd.ms-excel",
+                            key='stock_option_download'
+                        )
+                        render_frame_exports(
+                            '스톡옵션', (), file_version, build_stock_option_table, "스톡옵션_전체현황", 'stock_option_download'
+                        )
 
-                            # 엑셀 다운로드용 데이터프레임 생성
-                            download_data = []
-                            
-                            for _, row in df.iterrows():
+                        # 검색 결과 표시
+                        filtered_df = get_section_result(
+                            '스톡옵션_검색', file_version,
+                            lambda: filter_by_name(df, search_name, build_name_index(df['성명'], (file_version, '스톡옵션'))) if search_name else df
+                        )
+                        
+                        # 각 직원의 스톡옵션 정보 표시
+                        for _, row in filtered_df.iterrows():
+                            with st.expander(f"{row['성명']} ({row['본부']} / {row['팀']} / {row['직책']})"):
+                                # 총 금액 계산
                                 total_amount = sum(int(option['금액합계'].replace('원', '').replace(',', '')) for option in row['스톡옵션내역'])
-                                
-                                # 스톡옵션 상세 내역 문자열 생성
-                                details = []
+                                st.write(f"**총 행사가능 주식수:** {int(row['합계']):,}주  |  **총 행사가액:** {total_amount:,}원")
+                                st.markdown("---")
+                                st.markdown("**스톡옵션 상세 내역**")
+                                    
                                 current_group = None
-                                
                                 for option in row['스톡옵션내역']:
                                     if option['구분'] != current_group:
-                                        details.append(f"\n[부여코드: {option['구분']}]")
+                                        st.markdown(f"**부여코드: {option['구분']}**")
                                         current_group = option['구분']
-                                    
-                                    details.append(
-                                        f"행사코드: {option['회차']}  "
-                                        f"행사기간: {option['행사기간']}  "
-                                        f"행사가능 주식수: {option['부여주식']}  "
-                                        f"주당 행사가액: {option['행사금액']}  "
-                                    )
-                                
-                                download_data.append({
-                                    '임직원 정보': f"{row['성명']} ({row['본부']} / {row['팀']} / {row['직책']})",
-                                    '총계': f"총 행사가능 주식수: {int(row['합계']):,}주 | 총 행사가액: {total_amount:,}원",
-                                    '스톡옵션 상세내역': '\n'.join(details)
-                                })
-                            
-                            # 데이터프레임 생성 및 엑셀 변환
-                            download_df = pd.DataFrame(download_data)
-                            buffer = io.BytesIO()
-                            
-                            with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
-                                download_df.to_excel(writer, index=False, sheet_name='스톡옵션현황')
-                                workbook = writer.book
-                                worksheet = writer.sheets['스톡옵션현황']
-                                
-                                # 포맷 설정
-                                header_format = workbook.add_format({
-                                    'bold': True,
-                                    'bg_color': '#D9D9D9',
-                                    'border': 1,
-                                    'align': 'center',
-                                    'valign': 'vcenter'
-                                })
-                                
-                                cell_format = workbook.add_format({
-                                    'align': 'left',
-                                    'valign': 'vcenter',
-                                    'text_wrap': True
-                                })
-                                
-                                # 열 너비 설정
-                                worksheet.set_column('A:A', 40)
-                                worksheet.set_column('B:B', 40)
-                                worksheet.set_column('C:C', 80)
-                                
-                                # 행 높이 설정
-                                worksheet.set_default_row(30)
-                                
-                                # 헤더 포맷 적용
-                                for col_num, value in enumerate(download_df.columns.values):
-                                    worksheet.write(0, col_num, value, header_format)
-                                
-                                # 데이터 포맷 적용
-                                for row_num in range(len(download_df)):
-                                    for col_num in range(len(download_df.columns)):
-                                        worksheet.write(row_num + 1, col_num, download_df.iloc[row_num, col_num], cell_format)
-                            
-                            # 다운로드 버튼 배치
-                            st.download_button(
-                                label="📥 전체 스톡옵션 현황 다운로드",
-                                data=buffer.getvalue(),
-                                file_name="스톡옵션_전체현황.xlsx",
-                                mime="application/vnd.ms-excel",
-                                key='stock_option_download'
-                            )
-
-                            # 검색 결과 표시
-                            if search_name:
-                                filtered_df = df[df['성명'].str.contains(search_name, case=False, na=False)]
-                            else:
-                                filtered_df = df
-                            
-                            # 각 직원의 스톡옵션 정보 표시
-                            for _, row in filtered_df.iterrows():
-                                with st.expander(f"{row['성명']} ({row['본부']} / {row['팀']} / {row['직책']})"):
-                                    # 총 금액 계산
-                                    total_amount = sum(int(option['금액합계'].replace('원', '').replace(',', '')) for option in row['스톡옵션내역'])
-                                    st.write(f"**총 행사가능 주식수:** {int(row['합계']):,}주  |  **총 행사가액:** {total_amount:,}원")
-                                    st.markdown("---")
-                                    st.markdown("**스톡옵션 상세 내역**")
-                                    
-                                    current_group = None
-                                    for option in row['스톡옵션내역']:
-                                        if option['구분'] != current_group:
-                                            st.markdown(f"**부여코드: {option['구분']}**")
-                                            current_group = option['구분']
                                         
-                                        cols = st.columns([1, 1.5, 1, 1.5, 1.5, 1.5])
-                                        cols[0].write(f"행사코드: {option['회차']}")
-                                        cols[1].write(f"행사기간: {option['행사기간']}")
-                                        cols[2].write(f"행사비율: {option['행사가능비율']}")
-                                        cols[3].write(f"행사가능 주식수: {option['부여주식']}")
-                                        cols[4].write(f"주당 행사가액: {option['행사금액']}")
-                                        cols[5].write(f"행사가액 합계: {option['금액합계']}")
+                                    cols = st.columns([1, 1.5, 1, 1.5, 1.5, 1.5])
+                                    cols[0].write(f"행사코드: {option['회차']}")
+                                    cols[1].write(f"행사기간: {option['행사기간']}")
+                                    cols[2].write(f"행사비율: {option['행사가능비율']}")
+                                    cols[3].write(f"행사가능 주식수: {option['부여주식']}")
+                                    cols[4].write(f"주당 행사가액: {option['행사금액']}")
+                                    cols[5].write(f"행사가액 합계: {option['금액합계']}")
                     else:
                         st.warning("처리할 스톡옵션 데이터가 없습니다.") 
                         
@@ -4157,7 +4060,8 @@ def main():
                 if not df.empty and '성명' in df.columns:
                     # 성명 컬럼의 값을 문자열로 변환하고 빈 값을 처리
                     df['성명'] = df['성명'].fillna('').astype(str)
-                    df = df[df['성명'].str.contains(name, na=False)]
+                    name_index = build_name_index(df['성명'], (get_data_version(), '명부'))
+                    df = filter_by_name(df, name, name_index)
                 else:
                     df = pd.DataFrame()  # 빈 데이터프레임 반환
             
@@ -4172,22 +4076,9 @@ def main():
             if selected_research_labs and '전체' not in selected_research_labs:
                 df = df[df['기업부설연구소구분'].isin(selected_research_labs)]
             
-            # 연봉 데이터 처리
+            # 연봉 데이터 처리 (키별 연봉 인덱스와 한 번에 병합, 표시 전까지 숫자 유지)
             if salary_df is not None:
-                # 연봉 데이터와 병합 전에 성명이 있는지 확인
-                df['계약 연봉'] = 0  # 기본값 설정
-                df['급여'] = 0  # 기본값 설정
-                
-                # salary_df에 있는 성명만 연봉 정보 업데이트
-                for idx, row in df.iterrows():
-                    if row['성명'] in salary_df['성명'].values:
-                        salary_info = salary_df[salary_df['성명'] == row['성명']].iloc[0]
-                        df.at[idx, '계약 연봉'] = salary_info['계약 연봉']
-                        df.at[idx, '급여'] = np.ceil(salary_info['계약 연봉'] / 12)
-                
-                # 천 단위 구분자로 표시
-                df['계약 연봉'] = df['계약 연봉'].apply(lambda x: '{:,.0f}'.format(x))
-                df['급여'] = df['급여'].apply(lambda x: '{:,.0f}'.format(x))
+                df = attach_salary(df, salary_df)
             else:
                 # 연봉 데이터가 없는 경우 빈 컬럼 추가
                 df['계약 연봉'] = np.nan
@@ -4202,12 +4093,6 @@ def main():
                 )
             ]
             
-            # 조회일자 기준으로 인사발령 데이터 필터링
-            df_history_filtered = df_history[df_history['발령일'] <= pd.Timestamp(query_date)]
-            
-            # 각 직원별 가장 최근 발령 데이터만 선택
-            df_history_filtered = df_history_filtered.sort_values('발령일').groupby('성명').last().reset_index()
-            
                                       # 기본 컬럼 설정
             base_columns = [
                 "기업부설연구소구분", "성명", "본부", "실", "팀", "직무", "직위", "입사일", "주민등록번호", 
@@ -4222,28 +4107,9 @@ def main():
                 "발령일", "구분", "성명", "변경후_본부",  "변경후_팀", "변경후_직책"
             ]
             
-            # 재직기간 계산 함수
-            def calculate_employment_period(row):
-                if pd.isna(row['입사일']):
-                    return None
-                
-                start_date = pd.to_datetime(row['입사일'])
-                
-                # 재직상태가 '퇴직'인 경우 퇴사일을 기준으로 계산
-                if row['재직상태'] == '퇴직' and pd.notna(row['퇴사일']):
-                    end_date = pd.to_datetime(row['퇴사일'])
-                else:
-                    # 그 외의 경우 조회일자를 기준으로 계산
-                    end_date = pd.Timestamp(query_date)
-                
-                years = (end_date - start_date).days // 365
-                months = ((end_date - start_date).days % 365) // 30
-                
-                return f"{years}년 {months}개월"
-            
             # 데이터 필터링
-            if name:
-                df = df[df['성명'].str.contains(name, na=False)]
+            if name and '성명' in df.columns:
+                df = filter_by_name(df, name, name_index)
             
             if employment_type != "전체":
                 df = df[df['고용구분'] == employment_type]
@@ -4251,20 +4117,12 @@ def main():
             if employment_status != "전체":
                 df = df[df['재직상태'] == employment_status]
             
-            # 재직기간 계산
-            df['재직기간'] = df.apply(calculate_employment_period, axis=1)
-            
             # 부서 이력 데이터 처리
             if show_department_history:
-                # 인사발령 데이터와 조인
-                df_merged = pd.merge(
-                    df, 
-                    df_history_filtered, 
-                    left_on='성명', 
-                    right_on='성명', 
-                    how='left',
-                    suffixes=('', '_history')  # 중복 컬럼에 접미사 추가
-                )
+                # 조회일자 시점의 조직 상태를 사번 기준으로 조인 (월말 스냅샷 + 이후 발령 재생)
+                history_key = '사번' if '사번' in df.columns and '사번' in df_history.columns else '성명'
+                org_snapshots = build_org_snapshots(df_history, get_data_version(), history_key)
+                df_merged = attach_org_as_of(df, org_snapshots, query_date)
                 
                 # 발령이 없는 경우 기본값 설정
                 df_merged['변경후_본부'] = df_merged['변경후_본부'].fillna(df_merged['본부'])
@@ -4295,8 +4153,9 @@ def main():
             max_height = 800  # 최대 높이
             calculated_height = min(max(min_height, len(df_display) * row_height), max_height)
             
+            # 계약 연봉/급여는 숫자로 두고 표시할 때만 천 단위 구분자 적용
             st.dataframe(
-                df_display,
+                df_display.style.format({'계약 연봉': '{:,.0f}', '급여': '{:,.0f}'}, na_rep=''),
                 height=calculated_height,
                 use_container_width=True,
                 hide_index=True
@@ -4304,14 +4163,23 @@ def main():
             st.markdown("<br>", unsafe_allow_html=True)                
             # 엑셀 다운로드 버튼
             if not df_display.empty:
-                excel_data = convert_df_to_excel(df_display)
                 download_filename = f"임직원명부_{query_date.strftime('%Y%m%d')}.xlsx"
                 
-                st.download_button(
+                render_export_button(
+                    '임직원명부_과제용',
+                    (query_date, name, employment_type, employment_status, selected_research_labs, show_department_history),
+                    (get_data_version(), get_data_version("General/00_2. HRmate/hrmate권한.xlsx")),
+                    lambda: convert_df_to_excel(df_display),
                     label="📥 엑셀 다운로드",
-                    data=excel_data,
                     file_name=download_filename,
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    key="research_roster_download"
+                )
+                render_frame_exports(
+                    '임직원명부_과제용',
+                    (query_date, name, employment_type, employment_status, selected_research_labs, show_department_history),
+                    (get_data_version(), get_data_version("General/00_2. HRmate/hrmate권한.xlsx")),
+                    lambda: df_display, f"임직원명부_{query_date.strftime('%Y%m%d')}", "research_roster_download"
                 )
             
         elif menu == "🎫 명함발급":
@@ -4448,22 +4316,265 @@ def load_salary_data():
             st.warning("연봉 데이터에 필요한 컬럼(성명, 계약 연봉)이 없습니다.")
             return None
             
-        return df[['성명', '계약 연봉']]
+        # 사번 컬럼이 있으면 함께 반환 (동명이인 구분용 조인 키)
+        columns = ['사번', '성명', '계약 연봉'] if '사번' in df.columns else ['성명', '계약 연봉']
+        return df[columns]
     except Exception as e:
         st.error(f"연봉 데이터를 불러오는 중 오류가 발생했습니다: {str(e)}")
         return None
 
+@st.cache_data(ttl=3600)
+def build_salary_index(_salary_df, data_version, key):
+    """연봉 시트를 조인 키(사번 또는 성명) 1건당 1행으로 정리하고 급여(계약 연봉/12 올림)를 미리 계산하는 함수
+
+    같은 키가 여러 번 나오면 첫 행을 사용하며, data_version(연봉 시트 수정 시각)이 바뀔 때만 다시 만든다.
+    """
+    salary_index = _salary_df[[key, '계약 연봉']].dropna(subset=[key])
+    # 엑셀에서 숫자(1001.0)/문자('1001')로 섞여 읽히는 사번도 같은 키로 맞도록 정규화
+    salary_index = salary_index.assign(_조인키=normalize_employee_key(salary_index[key]))
+    salary_index = salary_index[salary_index['_조인키'] != '']
+    salary_index = salary_index.drop_duplicates(subset='_조인키', keep='first')[['_조인키', '계약 연봉']].copy()
+    salary_index['계약 연봉'] = pd.to_numeric(salary_index['계약 연봉'], errors='coerce').fillna(0)
+    salary_index['급여'] = np.ceil(salary_index['계약 연봉'].to_numpy(dtype=float) / 12)
+    return salary_index.set_index('_조인키')
+
+def attach_salary(df, salary_df):
+    """임직원 데이터에 연봉 인덱스를 붙여 계약 연봉/급여(숫자) 컬럼을 추가하는 함수
+
+    사번이 양쪽에 있으면 사번으로 찾고, 사번이 비었거나 맞는 행이 없으면 성명으로 찾는다. 연봉 정보가 없으면 0
+    """
+    salary_version = get_data_version("General/00_2. HRmate/hrmate권한.xlsx")
+    name_index = build_salary_index(salary_df, salary_version, '성명')
+    salary = name_index.reindex(normalize_employee_key(df['성명']).to_numpy()).reset_index(drop=True)
+
+    if '사번' in df.columns and '사번' in salary_df.columns:
+        id_index = build_salary_index(salary_df, salary_version, '사번')
+        id_salary = id_index.reindex(normalize_employee_key(df['사번']).to_numpy()).reset_index(drop=True)
+        salary = id_salary.where(id_salary['계약 연봉'].notna(), salary, axis=0)
+
+    merged = df.drop(columns=['계약 연봉', '급여'], errors='ignore').copy()
+    merged['계약 연봉'] = salary['계약 연봉'].fillna(0).to_numpy()
+    merged['급여'] = salary['급여'].fillna(0).to_numpy()
+    return merged
+
 # 초과근무 데이터 로드
+def normalize_overtime_hours(values):
+    """초과시간 값(datetime.time/시각, timedelta, 숫자)을 시간 단위 float64 Series로 바꾸는 함수
+
+    시각은 시 + 분/60, timedelta는 총 시간으로 계산하며 형식별 마스크로 묶어 한 번에 변환한다. 변환할 수 없는 값은 NaN
+    """
+    if pd.api.types.is_timedelta64_dtype(values):
+        return values.dt.total_seconds() / 3600
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return (values.dt.hour + values.dt.minute / 60).astype('float64')
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype('float64')
+
+    values = values.astype(object)
+    value_types = values.map(type)
+    is_time = value_types == time
+    is_datetime = value_types.isin([datetime, pd.Timestamp])
+    is_timedelta = value_types.isin([timedelta, pd.Timedelta])
+    is_number = ~(is_time | is_datetime | is_timedelta)
+
+    hours = pd.Series(np.nan, index=values.index, dtype='float64')
+    if is_time.any():
+        # datetime.time은 배열 변환 경로가 없어 분 단위 정수로 한 번에 뽑아낸 뒤 계산
+        minutes = np.fromiter((value.hour * 60 + value.minute for value in values[is_time]), dtype='int64', count=int(is_time.sum()))
+        hours[is_time] = minutes // 60 + (minutes % 60) / 60
+    if is_datetime.any():
+        stamps = pd.to_datetime(values[is_datetime])
+        hours[is_datetime] = stamps.dt.hour + stamps.dt.minute / 60
+    if is_timedelta.any():
+        hours[is_timedelta] = pd.to_timedelta(values[is_timedelta]).dt.total_seconds() / 3600
+    if is_number.any():
+        hours[is_number] = pd.to_numeric(values[is_number], errors='coerce')
+    return hours
+
+# 채용 처우협상 임금테이블 (직군 → 연차 오름차순 배열 + 최소/평균/최대 연봉 배열)
+SALARY_TABLE_PATH = "General/00_2. HRmate/salary_table.xlsx"
+SALARY_BAND_COLUMNS = ['최소연봉', '평균연봉', '최대연봉']
+# 파일 수정 시각을 SharePoint에 다시 묻기 전까지 세션에 저장된 값을 쓰는 시간(초)
+SALARY_VERSION_CHECK_SECONDS = 60
+
+@st.cache_resource
+def get_salary_band_cache():
+    """세션 간 공유되는 임금테이블 인덱스 저장소(파일 버전 → 인덱스, 최신 1개)를 반환하는 함수"""
+    return {'bands': {}, 'lock': threading.Lock()}
+
+def load_salary_bands():
+    """salary_table.xlsx의 수정 시각을 확인해 같은 버전이면 저장된 인덱스를, 바뀌었으면 새로 받아 만든 인덱스를 반환하는 함수
+
+    수정 시각은 SALARY_VERSION_CHECK_SECONDS마다 한 번만 조회하고 그 사이에는 세션에 저장된 값을 사용한다.
+    파일을 받지 못하면 None을 반환하고 저장하지 않으므로 다음 요청에서 다시 시도한다.
+    """
+    checked_at = st.session_state.get(f"{SALARY_TABLE_PATH}_checked_at")
+    if checked_at is None or (datetime.now() - checked_at).total_seconds() >= SALARY_VERSION_CHECK_SECONDS:
+        latest_version = get_file_last_modified(SALARY_TABLE_PATH)
+        # 세션에 저장된 파일이 이전 버전이면 버리고 다시 받기
+        if st.session_state.get(f"{SALARY_TABLE_PATH}_modified_time") != latest_version:
+            st.session_state[f"{SALARY_TABLE_PATH}_modified_time"] = latest_version
+            st.session_state.pop(f"{SALARY_TABLE_PATH}_data", None)
+        if latest_version is not None:
+            st.session_state[f"{SALARY_TABLE_PATH}_checked_at"] = datetime.now()
+    version = st.session_state.get(f"{SALARY_TABLE_PATH}_modified_time")
+
+    cache = get_salary_band_cache()
+    with cache['lock']:
+        if version is not None and version in cache['bands']:
+            return cache['bands'][version]
+
+    file_bytes = get_sharepoint_file_bytes(SALARY_TABLE_PATH)
+    if not file_bytes:
+        return None
+
+    salary_bands = build_salary_bands(file_bytes)
+    if version is not None:
+        with cache['lock']:
+            cache['bands'] = {version: salary_bands}
+    return salary_bands
+
+def build_salary_bands(file_bytes):
+    """salary_table.xlsx 내용으로 직군별 연차·연봉 배열 인덱스를 만드는 함수"""
+    salary_table = pd.read_excel(file_bytes)
+    
+    # 숫자 컬럼들을 float 타입으로 변환
+    for col in SALARY_BAND_COLUMNS + ['연차']:
+        salary_table[col] = pd.to_numeric(salary_table[col], errors='coerce')
+    
+    # 같은 직군·연차가 여러 행이면 첫 행 사용
+    salary_table = salary_table.dropna(subset=['연차']).drop_duplicates(['직군', '연차'], keep='first')
+    salary_bands = {}
+    for job_category, group in salary_table.groupby('직군', sort=False):
+        group = group.sort_values('연차', kind='stable')
+        salary_bands[job_category] = (
+            group['연차'].to_numpy(dtype=float),
+            group[SALARY_BAND_COLUMNS].to_numpy(dtype=float),
+        )
+    return salary_bands
+
+def lookup_salary_band(salary_bands, job_category, years, neighbor_years=1):
+    """직군·연차의 (최소, 평균, 최대) 연봉과 전후 neighbor_years년 연차의 임금테이블 표를 반환하는 함수 - 해당 연차가 없으면 band는 None"""
+    empty = pd.DataFrame(columns=['연차'] + SALARY_BAND_COLUMNS)
+    if job_category not in salary_bands:
+        return None, empty
+    band_years, band_values = salary_bands[job_category]
+
+    position = np.searchsorted(band_years, years)
+    band = band_values[position] if position < len(band_years) and band_years[position] == years else None
+
+    start = np.searchsorted(band_years, years - neighbor_years, side='left')
+    end = np.searchsorted(band_years, years + neighbor_years, side='right')
+    related = pd.DataFrame(band_values[start:end], columns=SALARY_BAND_COLUMNS).round().astype(int)
+    related.insert(0, '연차', band_years[start:end].astype(int))
+    return band, related
+
+# 초과근무 연월구분별 Parquet 저장소 (원본 파일 버전이 바뀐 경우에만 내용이 바뀐 연월을 다시 저장)
+OVERTIME_FILE_PATH = "General/07. 근태관리/초과근무기초데이터.xlsx"
+OVERTIME_STORE_DIR = os.path.join(tempfile.gettempdir(), 'hrmate_overtime_store')
+
+@st.cache_resource
+def get_overtime_store_lock():
+    """초과근무 저장소 갱신이 세션 간에 겹치지 않도록 하는 잠금 객체를 반환하는 함수"""
+    return threading.Lock()
+
+def read_overtime_manifest():
+    """저장소의 manifest(원본 버전, 연월별 파일·해시·행 수)를 읽는 함수 - 없으면 빈 manifest"""
+    manifest_path = os.path.join(OVERTIME_STORE_DIR, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        return {'source_version': None, 'months': {}}
+    with open(manifest_path, encoding='utf-8') as f:
+        return json.load(f)
+
+def write_store_file(path, data):
+    """임시 파일에 쓴 뒤 교체해 읽는 쪽에서 쓰다 만 파일을 보지 않도록 저장하는 함수"""
+    with open(f"{path}.tmp", 'wb') as f:
+        f.write(data)
+    os.replace(f"{path}.tmp", path)
+
+def sync_overtime_store(source_version, read_source):
+    """원본 버전이 manifest와 다를 때만 read_source()로 원본을 읽어 연월구분별 파티션을 갱신하고 manifest를 반환하는 함수
+
+    연월별 내용 해시가 같은 파티션은 다시 쓰지 않고, 원본에서 사라진 연월의 파티션은 지운다.
+    원본을 읽지 못했거나 연월구분 컬럼이 없으면 None
+    """
+    with get_overtime_store_lock():
+        manifest = read_overtime_manifest()
+        if source_version is not None and manifest['source_version'] == source_version and all(
+            os.path.exists(os.path.join(OVERTIME_STORE_DIR, entry['file'])) for entry in manifest['months'].values()
+        ):
+            return manifest
+
+        df = read_source()
+        if df is None or '연월구분' not in df.columns:
+            return None
+
+        os.makedirs(OVERTIME_STORE_DIR, exist_ok=True)
+        months = {}
+        for month, part in df.groupby('연월구분', sort=True, dropna=False):
+            month_key = str(month)
+            part = part.reset_index(drop=True)
+            digest = hashlib.md5(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes()).hexdigest()
+            # 치환 후 이름이 같아지는 연월('2024-03', '2024/03' 등)이 파일을 공유하지 않도록 연월 값의 해시를 덧붙임
+            key_digest = hashlib.md5(month_key.encode('utf-8')).hexdigest()[:8]
+            file_name = f"{re.sub(r'[^0-9A-Za-z가-힣_-]', '_', month_key)}_{key_digest}.parquet"
+            previous = manifest['months'].get(month_key)
+            if previous is None or previous['hash'] != digest or not os.path.exists(os.path.join(OVERTIME_STORE_DIR, file_name)):
+                write_store_file(os.path.join(OVERTIME_STORE_DIR, file_name), convert_df_to_parquet(part))
+            months[month_key] = {'file': file_name, 'hash': digest, 'rows': len(part)}
+
+        # 현재 어느 연월도 쓰지 않는 파일만 지움
+        current_files = {entry['file'] for entry in months.values()}
+        for entry in manifest['months'].values():
+            if entry['file'] not in current_files and os.path.exists(os.path.join(OVERTIME_STORE_DIR, entry['file'])):
+                os.remove(os.path.join(OVERTIME_STORE_DIR, entry['file']))
+
+        manifest = {'source_version': source_version, 'months': months}
+        write_store_file(
+            os.path.join(OVERTIME_STORE_DIR, 'manifest.json'),
+            json.dumps(manifest, ensure_ascii=False).encode('utf-8')
+        )
+        return manifest
+
 def load_overtime_base_data():
+    """초과근무 데이터를 연월구분별 Parquet 저장소에서 로딩 - 원본 파일이 바뀌지 않았으면 엑셀을 다시 받거나 읽지 않음"""
+    if pyarrow is None:
+        return read_overtime_sheet()
+
+    source = {}
+    def read_source():
+        source['df'] = read_overtime_sheet()
+        return source['df']
+
+    try:
+        manifest = sync_overtime_store(get_data_version(OVERTIME_FILE_PATH), read_source)
+    except Exception:
+        # 저장소를 쓰거나 Parquet으로 바꿀 수 없으면 원본을 직접 읽음
+        return source['df'] if 'df' in source else read_overtime_sheet()
+    if manifest is None:
+        # 연월구분 컬럼이 없어 저장소를 만들지 않은 경우 원본을 그대로 사용
+        return source.get('df')
+
+    partitions = [
+        pd.read_parquet(os.path.join(OVERTIME_STORE_DIR, entry['file']))
+        for _, entry in sorted(manifest['months'].items())
+    ]
+    return pd.concat(partitions, ignore_index=True) if partitions else None
+
+def read_overtime_sheet():
     """SharePoint '초과근무기초데이터.xlsx'의 '근태신청관리 다운로드' 시트 로딩"""
     try:
-        file_bytes = get_sharepoint_file_bytes("General/07. 근태관리/초과근무기초데이터.xlsx")
+        file_bytes = get_sharepoint_file_bytes(OVERTIME_FILE_PATH)
         if not file_bytes:
             return None
             
         # 시트 읽기
         df = pd.read_excel(file_bytes, sheet_name="근태신청관리 다운로드")
         
+        # 초과시간을 시간 단위 숫자(float)로 한 번만 변환
+        if '초과시간' in df.columns:
+            df['초과시간'] = normalize_overtime_hours(df['초과시간'])
+        
         return df
 
     except Exception as e:
@@ -4541,5 +4652,990 @@ def load_employee_data():
         st.error(f"임직원 데이터를 불러오는 중 오류가 발생했습니다: {str(e)}")
         return None, None
 
+# 일별 재직 인원 시계열 (데이터 버전별 1회 계산)
+@st.cache_data(ttl=3600)
+def build_daily_headcount(_df, data_version):
+    """입사/퇴사 이벤트의 누적합으로 고용구분·본부별 일별 재직 인원을 계산하는 함수"""
+    df = _df[_df['입사일'].notna()]
+    if df.empty:
+        return pd.DataFrame()
+
+    start_date = df['입사일'].min().normalize()
+    end_date = pd.Timestamp(datetime.now().date())
+    keys = df[['고용구분', '본부']].fillna('-').astype(str)
+
+    # 입사일에 +1, 퇴사일 다음날에 -1 (퇴사일 당일까지 재직으로 집계)
+    hires = keys.assign(일자=df['입사일'].dt.normalize(), 변동=1)
+    has_exit = df['퇴사일'].notna()
+    exit_days = df.loc[has_exit, '퇴사일'].dt.normalize() + pd.Timedelta(days=1)
+    hire_days = hires.loc[has_exit, '일자']
+    # 퇴사일이 입사일보다 앞선 행은 -1을 입사일로 당겨 같은 날 +1과 상쇄 (연말 인원 기준과 동일하게 재직으로 집계하지 않음)
+    exit_days = exit_days.where(exit_days >= hire_days, hire_days)
+    exits = keys[has_exit].assign(일자=exit_days, 변동=-1)
+    events = pd.concat([hires, exits], ignore_index=True)
+    events = events[events['일자'] <= end_date]
+
+    daily = (
+        events.groupby(['일자', '고용구분', '본부'])['변동'].sum()
+        .unstack(['고용구분', '본부'], fill_value=0)
+        .reindex(pd.date_range(start_date, end_date, freq='D'), fill_value=0)
+        .cumsum()
+    )
+    daily.index.name = '일자'
+    return daily
+
+def resample_headcount(daily, start_date, end_date, granularity='일별', split_by='전체'):
+    """일별 재직 인원 시계열을 조회 기간·집계 단위·구분 기준으로 변환하는 함수"""
+    series = daily.loc[pd.Timestamp(start_date):pd.Timestamp(end_date)]
+
+    if split_by == '전체':
+        series = series.sum(axis=1).to_frame('전체')
+    else:
+        series = series.T.groupby(level=split_by).sum().T
+
+    # 재직 인원은 기간 말일 기준 값을 사용
+    rule = {'월별': 'ME', '분기별': 'QE'}.get(granularity)
+    if rule:
+        series = series.resample(rule).last()
+    return series
+
+# 근속기간 구분 (0~5개월/6~11개월/1년~2년/2년~3년/3년이상)
+TENURE_CATEGORIES = ["0~5개월", "6~11개월", "1년~2년", "2년~3년", "3년이상"]
+
+@st.cache_data(ttl=3600)
+def build_tenure_columns(_df, data_version):
+    """근속월수와 근속기간 구분(범주형)을 벡터 연산으로 계산하는 함수"""
+    # 평균 한 달을 30.44일로 계산
+    months = (_df['퇴사일'] - _df['입사일']).dt.days / 30.44
+    category = pd.cut(
+        months,
+        bins=[-np.inf, 5, 11, 24, 36, np.inf],
+        labels=TENURE_CATEGORIES
+    )
+    return pd.DataFrame({'근속월수': months, '근속기간_구분': category}, index=_df.index)
+
+# 퇴사 집계 큐브 차원
+TURNOVER_CUBE_DIMENSIONS = ['퇴사연도', '본부', '팀', '직위', '고용구분', '근속기간_구분']
+
+@st.cache_data(ttl=3600)
+def build_turnover_cube(_df, data_version):
+    """퇴사연도·본부·팀·직위·고용구분·근속기간 구분별 퇴사자 수와 재직 인원(분모)을 사전 집계하는 함수"""
+    퇴직자_df = _df[_df['재직상태'] == '퇴직']
+    cube = 퇴직자_df.groupby(TURNOVER_CUBE_DIMENSIONS, observed=True, dropna=False).size()
+
+    # 퇴사율 분모 - 현재 재직자 (고용구분 무관)
+    headcount = _df[_df['재직상태'] == '재직'].groupby(['본부', '팀', '직위'], dropna=False).size()
+    return cube, headcount
+
+def slice_turnover_cube(cube, selected_year='전체', employment_type='정규직'):
+    """퇴사 집계 큐브에서 퇴사연도·고용구분 조건에 해당하는 셀만 선택하는 함수"""
+    mask = cube.index.get_level_values('고용구분') == employment_type
+    if selected_year != '전체':
+        mask &= cube.index.get_level_values('퇴사연도') == selected_year
+    return cube[mask]
+
+def build_turnover_table(turnover, headcount, by='본부'):
+    """퇴사 집계 큐브 조각으로 구분별 근속기간·퇴사율·조기퇴사율 표(총합계 포함)를 만드는 함수"""
+    # 팀/직위는 같은 이름이 여러 본부에 있으므로 (본부, 구분) 경로로 묶음
+    levels = ['본부'] if by == '본부' else ['본부', by]
+    level = levels[0] if len(levels) == 1 else levels
+
+    # 구분(본부/팀/직위)별 근속기간 분석
+    구분별_근속기간 = (
+        turnover.groupby(level=levels + ['근속기간_구분'], observed=False).sum()
+        .unstack('근속기간_구분', fill_value=0)
+        .reindex(columns=TENURE_CATEGORIES)
+    )
+
+    # 재직자 수 / 퇴직자 수
+    재직자_수 = headcount.groupby(level=level).sum()
+    퇴직자_수 = turnover.groupby(level=level).sum()
+
+    # 퇴사율 계산
+    구분별_퇴사율 = (퇴직자_수 / (재직자_수 + 퇴직자_수) * 100).round(1)
+
+    # 조기퇴사율 계산 (1년 미만 퇴사자)
+    조기퇴사자_수 = 구분별_근속기간[["0~5개월", "6~11개월"]].sum(axis=1)
+    조기퇴사율 = (조기퇴사자_수 / (재직자_수 + 퇴직자_수) * 100).round(1)
+
+    # 결과 테이블 생성
+    result_df = pd.DataFrame({
+        '0~5개월': 구분별_근속기간["0~5개월"],
+        '6~11개월': 구분별_근속기간["6~11개월"],
+        '1년~2년': 구분별_근속기간["1년~2년"],
+        '2년~3년': 구분별_근속기간["2년~3년"],
+        '3년이상': 구분별_근속기간["3년이상"],
+        '퇴직인원': 퇴직자_수,
+        '재직인원': 재직자_수,
+        '퇴사율': 구분별_퇴사율.fillna(0).map('{:.1f}%'.format),
+        '조기퇴사율': 조기퇴사율.fillna(0).map('{:.1f}%'.format),
+        '퇴사율 비중': 구분별_퇴사율.fillna(0).map('{:.1f}%'.format)
+    }).fillna(0)
+    if by != '본부':
+        result_df.index = [f"{본부} / {구분}" for 본부, 구분 in result_df.index]
+
+    # 합계 행 추가
+    total_row = pd.Series({
+        '0~5개월': result_df['0~5개월'].sum(),
+        '6~11개월': result_df['6~11개월'].sum(),
+        '1년~2년': result_df['1년~2년'].sum(),
+        '2년~3년': result_df['2년~3년'].sum(),
+        '3년이상': result_df['3년이상'].sum(),
+        '퇴직인원': result_df['퇴직인원'].sum(),
+        '재직인원': result_df['재직인원'].sum(),
+        '퇴사율': f"{(result_df['퇴직인원'].sum() / (result_df['재직인원'].sum() + result_df['퇴직인원'].sum()) * 100):.1f}%",
+        '조기퇴사율': f"{(result_df['0~5개월'].sum() + result_df['6~11개월'].sum()) / (result_df['재직인원'].sum() + result_df['퇴직인원'].sum()) * 100:.1f}%",
+        '퇴사율 비중': f"{(result_df['퇴직인원'].sum() / (result_df['재직인원'].sum() + result_df['퇴직인원'].sum()) * 100):.1f}%"
+    }, name='총합계')
+
+    return pd.concat([result_df, pd.DataFrame(total_row).T])
+
+# 연도별 입퇴사/연말 인원 통계 (데이터 버전별 1회 계산)
+@st.cache_data(ttl=3600)
+def build_yearly_stats(_df, data_version):
+    """전체 연도·고용구분의 입사/퇴사/연말 재직 인원을 한 번의 groupby로 계산하는 함수"""
+    df = _df[['입사일', '퇴사일', '고용구분']]
+    hire_year = df['입사일'].dt.year
+    exit_year = df['퇴사일'].dt.year
+
+    # 연말(12/31) 기준 재직 집계에서 빠지는 연도 - 12/31 퇴사자는 해당 연도 말까지 재직으로 집계
+    out_year = exit_year + (
+        (df['퇴사일'].dt.month == 12) & (df['퇴사일'].dt.day == 31)
+    ).astype(int)
+    out_year = out_year.where(out_year >= hire_year, hire_year)
+
+    has_hire = df['입사일'].notna()
+    has_exit = df['퇴사일'].notna()
+    events = pd.concat([
+        pd.DataFrame({'연도': hire_year[has_hire], '고용구분': df.loc[has_hire, '고용구분'],
+                      '입사': 1, '퇴사': 0, '재직변동': 1}),
+        pd.DataFrame({'연도': exit_year[has_exit], '고용구분': df.loc[has_exit, '고용구분'],
+                      '입사': 0, '퇴사': 1, '재직변동': 0}),
+        pd.DataFrame({'연도': out_year[has_hire & has_exit], '고용구분': df.loc[has_hire & has_exit, '고용구분'],
+                      '입사': 0, '퇴사': 0, '재직변동': -1}),
+    ], ignore_index=True)
+    events['고용구분'] = events['고용구분'].fillna('-')
+
+    first_year = int(hire_year.min()) if has_hire.any() else datetime.now().year
+    years = range(first_year, datetime.now().year + 1)
+
+    # 연도 x (구분, 고용구분) 집계 후 재직 인원은 연도 순 누적합
+    by_year = (
+        events.groupby(['연도', '고용구분'])[['입사', '퇴사', '재직변동']].sum()
+        .unstack('고용구분', fill_value=0)
+        .reindex(years, fill_value=0)
+    )
+    headcount = by_year['재직변동'].cumsum()
+
+    def by_type(frame, employment_type):
+        return frame[employment_type] if employment_type in frame.columns else 0
+
+    stats_df = pd.DataFrame({
+        '연도': list(years),
+        '전체': headcount.sum(axis=1),
+        '정규직_전체': by_type(headcount, '정규직'),
+        '계약직_전체': by_type(headcount, '계약직'),
+        '정규직_입사': by_type(by_year['입사'], '정규직'),
+        '정규직_퇴사': by_type(by_year['퇴사'], '정규직'),
+        '계약직_입사': by_type(by_year['입사'], '계약직'),
+        '계약직_퇴사': by_type(by_year['퇴사'], '계약직'),
+    }, index=list(years))
+    return stats_df.reset_index(drop=True).astype(int)
+
+# HTML 표 렌더링 (열 단위로 셀 문자열을 만든 뒤 한 번에 join)
+def render_html_table(cells, cell_attrs=None, header=None, table_attrs='', header_attrs=''):
+    """셀 텍스트 DataFrame을 열 단위 문자열 연산으로 <td>로 만들고 행을 한 번에 join하여 HTML 표를 만드는 함수
+
+    cell_attrs: 열 이름별 <td> 속성 (문자열 또는 행별 속성 Series, 예: " class='red-text'")
+    header: 머리글 목록 (None이면 머리글 행 생략), header_attrs: 머리글 <th> 공통 속성
+    """
+    cell_attrs = cell_attrs or {}
+    rows = pd.Series('', index=cells.index, dtype=object)
+    for col in cells.columns:
+        rows = rows + '<td' + cell_attrs.get(col, '') + '>' + cells[col].astype(str) + '</td>'
+
+    html = [f'<table{table_attrs}>']
+    if header is not None:
+        html.append('<tr>' + ''.join(f'<th{header_attrs}>{col}</th>' for col in header) + '</tr>')
+    html.append(''.join('<tr>' + rows + '</tr>'))
+    html.append('</table>')
+    return ''.join(html)
+
+@st.cache_data(ttl=3600)
+def render_turnover_table_html(_result_df, data_version, selected_year, by):
+    """구분별 근속기간·퇴사율 표의 HTML을 만드는 함수 (데이터 버전·조회 조건별 캐시)"""
+    count_columns = TENURE_CATEGORIES + ['퇴직인원', '재직인원']
+    rate_columns = [col for col in _result_df.columns if col not in count_columns]
+
+    cells = _result_df.copy()
+    cells[count_columns] = cells[count_columns].apply(pd.to_numeric).astype(int)
+    cells.insert(0, '구분', _result_df.index)
+
+    # 비율이 0%보다 크면 빨간 글씨
+    cell_attrs = {
+        col: pd.Series(
+            np.where(cells[col].str.rstrip('%').astype(float) > 0, " class='red-text'", ''),
+            index=cells.index
+        )
+        for col in rate_columns
+    }
+    return render_html_table(
+        cells, cell_attrs, header=cells.columns, table_attrs=" class='custom-table'"
+    )
+
+def format_report_content(업무내용):
+    """업무내용의 줄바꿈을 <br>로, URL을 '링크'로 변환하는 함수 (HTML로 작성된 내용은 그대로 사용)"""
+    업무내용 = str(업무내용)
+    if 업무내용.startswith("<"):
+        return 업무내용
+
+    # 여러 줄 지원 및 URL 자동 링크 변환
+    업무내용 = 업무내용.replace("\n", "<br>")
+    url_pattern = r'https?://[^\s<>"]+|www\.[^\s<>"]+'
+    link_pattern = r'링크'
+    for url in re.findall(url_pattern, 업무내용):
+        # "링크" 텍스트가 있으면 해당 텍스트를 URL로 대체, 없으면 URL 자체를 링크로 변환
+        if re.search(link_pattern, 업무내용):
+            업무내용 = re.sub(link_pattern, f'<a href="{url}" target="_blank">링크</a>', 업무내용, count=1)
+        else:
+            업무내용 = 업무내용.replace(url, f'<a href="{url}" target="_blank">링크</a>')
+    return 업무내용
+
+@st.cache_data(ttl=3600)
+def render_work_report_html(_filtered_df, data_version, selected_status, selected_type_date):
+    """업무 공유/보고 표의 HTML을 만드는 함수 (데이터 버전·조회 조건별 캐시)"""
+    cells = pd.DataFrame({
+        '업무구분': ' ' + _filtered_df['업무구분'].astype(str),
+        '업무내용': _filtered_df['업무내용'].map(format_report_content),
+    })
+    cell_attrs = {
+        '업무구분': ' style="width: 20%; text-align: left; background-color: #f0f2f6; font-size: 13px;"',
+        '업무내용': ' style="width: 85%; text-align: left; padding-left: 15px; font-size: 13px;"',
+    }
+    return render_html_table(cells, cell_attrs, table_attrs=' style="width: 70%;"')
+
+@st.cache_data(ttl=3600)
+def render_schedule_html(_schedule_df, data_version, current_month):
+    """연간 주요일정 표의 HTML을 만드는 함수 (데이터 버전·현재 월별 캐시)"""
+    cell_attrs = {
+        _schedule_df.columns[0]: ' style="background-color: #f0f2f6; text-align: center; color: #000000;"'
+    }
+    for idx, col in enumerate(_schedule_df.columns[1:], start=1):
+        values = _schedule_df[col]
+        has_value = values != ""
+        # 현재 월(1월은 idx 1) 내용 > 진행 > 계획 > 기타 텍스트 > 빈 칸 순으로 스타일 적용
+        cell_attrs[col] = pd.Series(np.select(
+            [
+                has_value & (idx == current_month),
+                values.str.lower().str.contains("진행", regex=False),
+                values.str.lower().str.contains("계획", regex=False),
+                has_value,
+            ],
+            [
+                ' style="background-color: #ff3333; text-align: center; color: #FFFFFF;"',
+                ' style="background-color: #FFE5E5; text-align: center; color: #EE6C6C;"',
+                ' style="background-color: #F2F2F2; text-align: center; color: #A6A6A6;"',
+                ' style="background-color: #FFE5E6; text-align: center; color: #EE6C6C;"',
+            ],
+            default=' style="text-align: center; color: #A6A6A6;"'
+        ), index=_schedule_df.index)
+
+    return render_html_table(
+        _schedule_df, cell_attrs,
+        header=['구분'] + list(_schedule_df.columns[1:]),
+        table_attrs=' class="schedule-table"',
+        header_attrs=' style="color: #000000; background-color: #f0f2f6; font-weight: normal;"'
+    )
+
+# Plotly 차트 캐시 (차트 ID·데이터 버전·조회 조건별, 최대 개수 초과 시 오래된 차트부터 제거)
+FIGURE_CACHE_SIZE = 64
+
+@st.cache_resource
+def get_figure_cache():
+    """세션 간 공유되는 Plotly 차트 LRU 저장소를 반환하는 함수"""
+    return {'figures': OrderedDict(), 'lock': threading.Lock()}
+
+def get_cached_figure(chart_id, data_version, filters, build_figure):
+    """(차트 ID, 데이터 버전, 조회 조건)별로 캐시된 차트를 반환하고, 없으면 build_figure()로 생성해 저장하는 함수"""
+    key = (chart_id, data_version, filters)
+    cache = get_figure_cache()
+    with cache['lock']:
+        if key in cache['figures']:
+            cache['figures'].move_to_end(key)
+            return cache['figures'][key]
+
+    fig = build_figure()
+    with cache['lock']:
+        cache['figures'][key] = fig
+        while len(cache['figures']) > FIGURE_CACHE_SIZE:
+            cache['figures'].popitem(last=False)
+    return fig
+
+# 화면 구역별 입력 위젯 (구역 ID → 위젯 key 목록) - 입력값이 바뀐 구역만 다시 계산
+SECTION_INPUTS = {
+    '인원현황_요약': ['query_date_input'],
+    '인원현황_입퇴사자': [],
+    '인원현황_퇴사율표': ['tenure_year_select', 'turnover_by_select'],
+    '임직원명부_조회': ['roster_query_date', 'roster_name', 'roster_employment_type',
+                    'roster_employment_status', 'roster_show_history'],
+    '스톡옵션_현황': [],
+    '스톡옵션_검색': ['stock_option_search'],
+}
+
+def get_section_result(section_id, data_version, compute):
+    """구역에 등록된 위젯 값과 데이터 버전이 직전 실행과 같으면 세션에 저장된 결과를, 아니면 compute() 결과를 반환하는 함수"""
+    inputs = tuple(st.session_state.get(key) for key in SECTION_INPUTS[section_id])
+    cache_key = (data_version, inputs)
+
+    if 'section_results' not in st.session_state:
+        st.session_state.section_results = {}
+    cached = st.session_state.section_results.get(section_id)
+    if cached is not None and cached[0] == cache_key:
+        return cached[1]
+
+    result = compute()
+    st.session_state.section_results[section_id] = (cache_key, result)
+    return result
+
+# 다운로드 파일 캐시 (세션별, 최근 사용 순으로 최대 EXPORT_CACHE_SIZE개 유지)
+EXPORT_CACHE_SIZE = 8
+
+def render_export_button(page, filters, data_version, build, label, file_name, mime, key):
+    """다운로드 파일을 요청할 때만 build()로 만들고 (화면, 조회 조건 해시, 데이터 버전)별로 세션에 저장해 다운로드 버튼을 표시하는 함수
+
+    저장된 파일이 없으면 '준비' 버튼만 표시하므로 조회 조건을 바꾸며 화면을 볼 때는 파일을 만들지 않는다.
+    """
+    cache_key = (page, hashlib.md5(repr(filters).encode('utf-8')).hexdigest(), data_version)
+    if 'export_cache' not in st.session_state:
+        st.session_state.export_cache = OrderedDict()
+    export_cache = st.session_state.export_cache
+
+    data = export_cache.get(cache_key)
+    if data is None:
+        if not st.button(f"{label} 준비", key=f"{key}_prepare"):
+            return
+        with st.spinner("다운로드 파일을 만드는 중입니다..."):
+            data = build()
+        export_cache[cache_key] = data
+        while len(export_cache) > EXPORT_CACHE_SIZE:
+            export_cache.popitem(last=False)
+    export_cache.move_to_end(cache_key)
+
+    st.download_button(label=label, data=data, file_name=file_name, mime=mime, key=key)
+
+# 페이지 단위 표 (정렬·열 선택·페이지 분할을 서버에서 처리하고 현재 페이지만 전송)
+TABLE_PAGE_SIZES = [50, 100, 200, 500]
+
+def render_paged_table(df, key, column_config=None, hide_index=True, row_height=35, max_height=600):
+    """표시 열, 정렬 기준, 페이지 크기를 고르고 현재 페이지의 행만 st.dataframe으로 표시하는 함수
+
+    정렬은 기준 열 하나만 정렬해 행 위치를 구한 뒤 현재 페이지 위치만 꺼내므로 전송량은 페이지 크기에만 비례한다.
+    """
+    columns = list(df.columns)
+    col1, col2, col3, col4, col5 = st.columns([0.4, 0.2, 0.12, 0.12, 0.16])
+    with col1:
+        visible_columns = st.multiselect("표시 열", columns, default=columns, key=f"{key}_columns")
+    with col2:
+        sort_column = st.selectbox("정렬 기준", ["기본 순서"] + columns, key=f"{key}_sort")
+    with col3:
+        sort_order = st.selectbox("정렬", ["오름차순", "내림차순"], key=f"{key}_order")
+    with col4:
+        page_size = st.selectbox("행 수", TABLE_PAGE_SIZES, key=f"{key}_page_size")
+
+    total_rows = len(df)
+    total_pages = max(1, -(-total_rows // page_size))
+    # 조회 조건이 바뀌어 페이지 수가 줄면 마지막 페이지로 맞춤
+    if st.session_state.get(f"{key}_page", 1) > total_pages:
+        st.session_state[f"{key}_page"] = total_pages
+    with col5:
+        page = st.number_input(f"페이지 (총 {total_pages})", min_value=1, max_value=total_pages, step=1, key=f"{key}_page")
+
+    start = (page - 1) * page_size
+    end = min(start + page_size, total_rows)
+    if sort_column == "기본 순서":
+        positions = np.arange(start, end)
+    else:
+        sort_values = df[sort_column].reset_index(drop=True)
+        ascending = sort_order == "오름차순"
+        try:
+            order = sort_values.sort_values(ascending=ascending, kind='stable', na_position='last').index
+        except TypeError:
+            # 문자/날짜가 섞인 열은 문자열 기준으로 정렬
+            order = sort_values.astype(str).sort_values(ascending=ascending, kind='stable').index
+        positions = order[start:end]
+
+    page_df = df.iloc[positions][visible_columns or columns]
+    st.dataframe(
+        page_df,
+        column_config=column_config,
+        hide_index=hide_index,
+        use_container_width=True,
+        height=min(max(len(page_df), 1) * row_height + 40, max_height)
+    )
+    st.caption(f"총 {total_rows:,}건 중 {start + 1 if total_rows else 0:,}~{end:,}건")
+
+def render_frame_exports(page, filters, data_version, build_frame, file_stem, key):
+    """엑셀 다운로드와 같은 조회 결과(build_frame()의 표)를 CSV(UTF-8 BOM)·Parquet으로도 내려받는 버튼을 표시하는 함수 - 서식 변환 없이 표 그대로 저장"""
+    render_export_button(
+        f"{page}_csv", filters, data_version, lambda: convert_df_to_csv(build_frame()),
+        label="📥 CSV 다운로드", file_name=f"{file_stem}.csv", mime="text/csv", key=f"{key}_csv"
+    )
+    if pyarrow is not None:
+        render_export_button(
+            f"{page}_parquet", filters, data_version, lambda: convert_df_to_parquet(build_frame()),
+            label="📥 Parquet 다운로드", file_name=f"{file_stem}.parquet",
+            mime="application/vnd.apache.parquet", key=f"{key}_parquet"
+        )
+
+# 기관제출용 인원현황 구분 항목
+AGENCY_REPORT_GROUPS = ['구분1', '구분2', '구분3']
+
+@st.cache_data(ttl=3600)
+def build_agency_report(_df, data_version, as_of):
+    """기준일 재직자의 구분1/2/3별 인원 분포(임원 우선, 총인원 포함)를 한 번의 groupby로 계산하는 함수"""
+    last_day = pd.Timestamp(as_of)
+    current_employees = _df[
+        (_df['입사일'].notna()) &
+        (_df['입사일'] <= last_day) &
+        ((_df['퇴사일'].isna()) |
+         (_df['퇴사일'] == pd.Timestamp('2050-12-31')) |
+         (_df['퇴사일'] >= last_day))
+    ]
+
+    # 구분1/2/3을 (항목, 구분) 범주형으로 펼쳐서 한 번에 집계
+    melted = current_employees[AGENCY_REPORT_GROUPS].melt(var_name='항목', value_name='구분')
+    melted['구분'] = melted['구분'].astype('category')
+    counts = melted.groupby(['항목', '구분'], observed=True, sort=False).size()
+
+    group_stats = {
+        group_col: format_agency_group_stats(
+            counts.xs(group_col, level='항목') if group_col in counts.index.get_level_values('항목')
+            else pd.Series(dtype=int)
+        )
+        for group_col in AGENCY_REPORT_GROUPS
+    }
+    return group_stats, current_employees
+
+def format_agency_group_stats(group_counts):
+    """구분별 인원수를 인원수 내림차순·'임원' 우선 열 순서의 1행 표(총인원 포함)로 만드는 함수"""
+    group_counts = group_counts[group_counts > 0].sort_values(ascending=False, kind='stable')
+
+    # '임원'을 첫 번째 열로 이동
+    order = [label for label in group_counts.index if label == '임원'] + \
+            [label for label in group_counts.index if label != '임원']
+    stats = group_counts.reindex(order).astype(int).to_frame('인원수').T
+    stats.columns = stats.columns.astype(object)
+    stats['총인원'] = int(group_counts.sum())  # 총인원 열 추가
+    return stats
+
+def build_agency_detail(current_employees):
+    """기준일 재직자의 인원상세 목록(No 포함)을 만드는 함수"""
+    detail_columns = ['성명', '본부', '실', '팀', '고용구분', '입사일', '재직상태', '남/여', '구분1', '구분2', '구분3']
+    detail_df = current_employees[detail_columns].copy()
+    detail_df['입사일'] = detail_df['입사일'].dt.strftime('%Y-%m-%d')
+
+    # 인덱스를 1부터 시작하는 번호로 리셋
+    detail_df = detail_df.reset_index(drop=True)
+    detail_df.index = detail_df.index + 1
+    detail_df.index.name = 'No'
+    return detail_df.reset_index()
+
+def build_agency_snapshots(_df, dates):
+    """여러 기준일의 재직 여부 행렬과 구분1/2/3별 인원수를 입사/퇴사 구간 배열 연산 한 번으로 계산하는 함수"""
+    hire = _df['입사일'].to_numpy(dtype='datetime64[ns]')
+    exit_ = _df['퇴사일'].to_numpy(dtype='datetime64[ns]')
+    as_of = np.array([pd.Timestamp(d) for d in dates], dtype='datetime64[ns]')[:, None]
+
+    # (기준일 수 x 인원 수) 재직 여부 - 퇴사일 없음/2050-12-31은 재직 중으로 처리
+    open_ended = np.isnat(exit_) | (exit_ == np.datetime64('2050-12-31'))
+    active = (hire <= as_of) & (open_ended | (exit_ >= as_of))
+    active_counts = active.astype(np.int32)
+
+    # 구분 값 one-hot 행렬과의 곱으로 기준일별 인원수 계산
+    counts = {}
+    for group_col in AGENCY_REPORT_GROUPS:
+        codes, labels = pd.factorize(_df[group_col])
+        one_hot = np.zeros((len(codes), len(labels)), dtype=np.int32)
+        valid = codes >= 0
+        one_hot[np.flatnonzero(valid), codes[valid]] = 1
+        counts[group_col] = pd.DataFrame(active_counts @ one_hot, index=list(dates), columns=labels)
+    return active, counts
+
+@st.cache_data(ttl=3600)
+def build_agency_workbook(_df, data_version, dates):
+    """기준일별 시트(구분1/2/3 인원 현황 + 인원상세)와 요약 시트로 구성된 엑셀 파일을 만드는 함수"""
+    active, counts = build_agency_snapshots(_df, dates)
+
+    def build_sheet(i):
+        group_stats = {
+            group_col: format_agency_group_stats(counts[group_col].iloc[i])
+            for group_col in AGENCY_REPORT_GROUPS
+        }
+        return group_stats, build_agency_detail(_df[active[i]])
+
+    # 기준일별 시트 데이터는 병렬로 생성, 엑셀 쓰기는 순차 처리
+    with ThreadPoolExecutor(max_workers=min(8, len(dates))) as executor:
+        sheets = list(executor.map(build_sheet, range(len(dates))))
+
+    summary = pd.DataFrame({
+        '기준일': [d.strftime('%Y-%m-%d') for d in dates],
+        '총인원': active.sum(axis=1),
+    })
+    for group_col in AGENCY_REPORT_GROUPS:
+        group_counts = counts[group_col]
+        summary = summary.join(
+            group_counts.loc[:, group_counts.sum() > 0].add_prefix(f"{group_col}_").reset_index(drop=True)
+        )
+
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        summary.to_excel(writer, sheet_name='요약', index=False)
+        title_format = writer.book.add_format({'bold': True})
+        for as_of, (group_stats, detail_df) in zip(dates, sheets):
+            sheet_name = as_of.strftime('%Y-%m-%d')
+            row = 0
+            for title, group_col in [
+                ("1. 주주간담회 등 IR팀 자료 작성용", '구분1'),
+                ("2. 투자자 사업현황 보고", '구분2'),
+                ("3. 의료기기 생산 및 수출·수입·수리실적보고", '구분3'),
+            ]:
+                group_stats[group_col].to_excel(writer, sheet_name=sheet_name, startrow=row + 1)
+                writer.sheets[sheet_name].write(row, 0, title, title_format)
+                row += 4
+            writer.sheets[sheet_name].write(row, 0, "인원상세", title_format)
+            detail_df.to_excel(writer, sheet_name=sheet_name, startrow=row + 1, index=False)
+    return output.getvalue()
+
+def normalize_employee_key(values):
+    """사번/성명 조인 키를 문자열로 통일하는 함수 (실수로 읽힌 사번 123.0 → '123')"""
+    keys = values.astype(str).str.strip()
+    numeric = pd.to_numeric(values, errors='coerce')
+    is_int = numeric.notna() & (numeric % 1 == 0)
+    keys[is_int] = numeric[is_int].astype('int64').astype(str)
+    return keys
+
+@st.cache_data(ttl=3600)
+def build_history_index(_df_history, data_version, key='사번'):
+    """인사발령 이력을 (사번, 발령일) 순으로 한 번 정렬하고, 직원별로 결측 항목을 이전 발령 값으로 채워 두는 함수
+
+    기존 groupby(...).last()와 같이 각 항목은 조회 시점까지의 마지막 non-null 값이 되도록 NaN만 채운다.
+    """
+    history = _df_history.copy()
+    history['발령일'] = pd.to_datetime(history['발령일'], errors='coerce')
+    history[key] = normalize_employee_key(history[key])
+    history = history[history['발령일'].notna() & (history[key] != '')]
+    history = history.sort_values([key, '발령일'], kind='stable').reset_index(drop=True)
+
+    fields = [col for col in history.columns if col not in (key, '발령일')]
+    if fields and not history.empty:
+        history[fields] = history.groupby(key, sort=False)[fields].ffill()
+    return {'key': key, 'history': history}
+
+@st.cache_data(ttl=3600)
+def build_org_snapshots(_df_history, data_version, key='사번'):
+    """발령 이력을 발령일 순으로 재생해 월말마다 직원별 마지막 발령 행 위치 스냅샷을 만드는 함수
+
+    snapshots는 (월말 수 × 직원 수) 정수 배열로, 각 값은 events의 행 위치(발령 없으면 -1)
+    """
+    history = build_history_index(_df_history, data_version, key)['history']
+    events = history.sort_values('발령일', kind='stable').reset_index(drop=True)
+    codes, employees = pd.factorize(events[key])
+    if events.empty:
+        month_ends = pd.DatetimeIndex([])
+    else:
+        last_day = max(events['발령일'].iloc[-1], pd.Timestamp(datetime.now().date()))
+        month_ends = pd.date_range(events['발령일'].iloc[0] + pd.offsets.MonthEnd(0), last_day + pd.offsets.MonthEnd(0), freq='ME')
+
+    # 월말마다 그 이하 발령까지 적용한 직원별 마지막 발령 위치를 기록 (이전 월 상태에 해당 월 발령만 반영)
+    bounds = events['발령일'].searchsorted(month_ends, side='right')
+    state = np.full(len(employees), -1, dtype=np.int32)
+    snapshots = np.empty((len(month_ends), len(employees)), dtype=np.int32)
+    start = 0
+    for i, end in enumerate(bounds):
+        apply_org_events(state, codes, start, end)
+        snapshots[i] = state
+        start = end
+    return {'key': key, 'month_ends': month_ends, 'snapshots': snapshots, 'events': events, 'codes': codes}
+
+def apply_org_events(state, codes, start, end):
+    """직원별 마지막 발령 위치 배열에 events[start:end] 발령(발령일 순)을 반영하는 함수"""
+    if end > start:
+        np.maximum.at(state, codes[start:end], np.arange(start, end, dtype=np.int32))
+
+def get_org_as_of(org_snapshots, query_date):
+    """조회일자 직전 월말 스냅샷에 그 이후 발령만 재생해 직원별 마지막 발령 행을 반환하는 함수"""
+    query_ts = pd.Timestamp(query_date)
+    month_ends = org_snapshots['month_ends']
+    events = org_snapshots['events']
+
+    i = month_ends.searchsorted(query_ts, side='right') - 1
+    if i >= 0:
+        state = org_snapshots['snapshots'][i].copy()
+        start = events['발령일'].searchsorted(month_ends[i], side='right')
+    else:
+        state = np.full(org_snapshots['snapshots'].shape[1], -1, dtype=np.int32)
+        start = 0
+    end = events['발령일'].searchsorted(query_ts, side='right')
+
+    apply_org_events(state, org_snapshots['codes'], start, end)
+    return events.iloc[np.sort(state[state >= 0])].set_index(org_snapshots['key'])
+
+def attach_org_as_of(df, org_snapshots, query_date):
+    """각 직원의 조회일자 시점 발령 정보(조직 상태)를 붙이는 함수 - 중복 컬럼은 _history 접미사"""
+    state = get_org_as_of(org_snapshots, query_date)
+    matched = state.reindex(normalize_employee_key(df[org_snapshots['key']])).reset_index(drop=True)
+    matched.columns = [f"{col}_history" if col in df.columns else col for col in matched.columns]
+    return pd.concat([df.reset_index(drop=True), matched], axis=1)
+
+# 조직 트리 (본부 → 실 → 팀)
+ORG_LEVELS = ['본부', '실', '팀']
+
+@st.cache_data(ttl=3600)
+def build_org_tree(_df, data_version):
+    """본부 → 실 → 팀 조직 트리를 만드는 함수 - 노드마다 하위 조직을 합산한 입사일/퇴사일 정렬 배열을 보관"""
+    levels = [col for col in ORG_LEVELS if col in _df.columns]
+    df = _df[_df['입사일'].notna()]
+    labels = df[levels].fillna('-').astype(str).apply(lambda col: col.str.strip().replace('', '-'))
+
+    hire = df['입사일'].dt.normalize()
+    exit_ = df['퇴사일'].dt.normalize()
+    # 퇴사일 당일까지 재직 - 퇴사일이 입사일보다 빠른 오류 데이터는 재직 기간 없음으로 처리
+    exit_before = exit_.mask(exit_ < hire, hire - pd.Timedelta(days=1))
+
+    hire_values = hire.to_numpy(dtype='datetime64[ns]')
+    exit_values = exit_.to_numpy(dtype='datetime64[ns]')
+    exit_before_values = exit_before.to_numpy(dtype='datetime64[ns]')
+
+    def make_node(positions):
+        exits = exit_values[positions]
+        exits_before = exit_before_values[positions]
+        return {
+            'hire': np.sort(hire_values[positions]),
+            'exit': np.sort(exits[~np.isnat(exits)]),
+            'exit_before': np.sort(exits_before[~np.isnat(exits_before)]),
+        }
+
+    # 각 단계(전체/본부/본부+실/본부+실+팀)별로 묶어 상위 노드는 하위 조직 전체를 포함
+    nodes = {(): make_node(np.arange(len(df)))}
+    children = {}
+    for depth in range(1, len(levels) + 1):
+        for path, positions in labels.groupby(levels[:depth]).indices.items():
+            path = path if isinstance(path, tuple) else (path,)
+            nodes[path] = make_node(positions)
+            children.setdefault(path[:-1], []).append(path)
+    for paths in children.values():
+        paths.sort()
+    return {'levels': levels, 'nodes': nodes, 'children': children}
+
+def query_org_tree(org_tree, as_of, parent=(), period_start=None):
+    """parent 바로 아래 조직들의 기준일 재직 인원과 기간(기본: 기준일 연도 1월 1일~기준일) 입사/퇴사 인원을 조회하는 함수"""
+    as_of = pd.Timestamp(as_of).normalize()
+    period_start = pd.Timestamp(period_start) if period_start is not None else as_of.replace(month=1, day=1)
+    as_of, period_start = as_of.to_datetime64(), period_start.to_datetime64()
+
+    rows = []
+    for path in org_tree['children'].get(tuple(parent), []):
+        node = org_tree['nodes'][path]
+        rows.append({
+            **dict(zip(org_tree['levels'], path)),
+            # 입사일 <= 기준일 이고 퇴사일 >= 기준일
+            '재직': int(np.searchsorted(node['hire'], as_of, side='right')
+                      - np.searchsorted(node['exit_before'], as_of, side='left')),
+            '입사': int(np.searchsorted(node['hire'], as_of, side='right')
+                      - np.searchsorted(node['hire'], period_start, side='left')),
+            '퇴사': int(np.searchsorted(node['exit'], as_of, side='left')
+                      - np.searchsorted(node['exit'], period_start, side='left')),
+        })
+    columns = org_tree['levels'][:len(parent) + 1] + ['재직', '입사', '퇴사']
+    return pd.DataFrame(rows, columns=columns)
+
+@st.cache_data(ttl=3600)
+def build_overtime_rollup(_overtime_df, data_version):
+    """초과근무 시간과 인원수를 (연월구분, 조직 경로)별로 합산해 본부 → 실 → 팀 노드마다 보관하는 함수"""
+    levels = [col for col in ORG_LEVELS if col in _overtime_df.columns]
+    # 초과시간은 load_overtime_base_data에서 시간 단위 숫자로 변환되어 있음
+    df = _overtime_df[['연월구분', '이름', '초과시간'] + levels]
+
+    rollup = {}
+    for depth in range(1, len(levels) + 1):
+        grouped = df.groupby(levels[:depth] + ['연월구분']).agg(초과시간=('초과시간', 'sum'), 인원수=('이름', 'nunique'))
+        # 단일 레벨은 리스트가 아닌 이름으로 넘겨야 경고 없이 스칼라 키로 묶임
+        level = levels[0] if depth == 1 else levels[:depth]
+        for path, node in grouped.groupby(level=level):
+            path = path if isinstance(path, tuple) else (path,)
+            rollup[path] = node.droplevel(levels[:depth])
+    return rollup
+
+@st.cache_data(ttl=3600)
+def build_overtime_matrix(_overtime_df, data_version):
+    """직원(이름, 이메일) × 연월구분 초과근무 시간 행렬, 직원별 소속 본부, 본부 × 연월구분 합계를 한 번에 만드는 함수
+
+    여러 달 추이·상위 N명·전월 대비 증감은 원본 행을 다시 집계하지 않고 이 행렬의 열만 잘라 계산한다.
+    """
+    matrix = (
+        _overtime_df.groupby(['이름', '이메일', '연월구분'])['초과시간'].sum()
+        .unstack('연월구분', fill_value=0.0)
+        .sort_index(axis=1)
+    )
+    if '본부' in _overtime_df.columns:
+        # 여러 본부에 기록이 있으면 가장 최근 연월의 본부를 소속으로 사용
+        employee_본부 = _overtime_df.sort_values('연월구분', kind='stable').groupby(['이름', '이메일'])['본부'].last()
+        employee_본부 = employee_본부.reindex(matrix.index)
+        본부_matrix = (
+            _overtime_df.groupby(['본부', '연월구분'])['초과시간'].sum()
+            .unstack('연월구분', fill_value=0.0)
+            .reindex(columns=matrix.columns, fill_value=0.0)
+        )
+    else:
+        employee_본부 = pd.Series('', index=matrix.index, name='본부')
+        본부_matrix = pd.DataFrame(columns=matrix.columns, dtype='float64')
+    return matrix, employee_본부, 본부_matrix
+
+def build_overtime_leaders(overtime_matrix, employee_본부, months, top_n):
+    """선택 기간(months) 초과근무 합계 상위 N명과 마지막 달의 전월 대비 증가 상위 N명 표를 행렬에서 만드는 함수"""
+    info = overtime_matrix.index.to_frame(index=False)
+    info['본부'] = employee_본부.to_numpy()
+
+    period_total = overtime_matrix[months].sum(axis=1).to_numpy()
+    top = info.assign(**{'기간 합계(시간)': period_total.round(1)})
+    top = top.nlargest(top_n, '기간 합계(시간)')
+
+    last_month = months[-1]
+    month_position = overtime_matrix.columns.get_loc(last_month)
+    if month_position == 0:
+        return top.reset_index(drop=True), None
+    previous_month = overtime_matrix.columns[month_position - 1]
+    current = overtime_matrix[last_month].to_numpy()
+    previous = overtime_matrix[previous_month].to_numpy()
+    delta = info.assign(**{
+        f'{previous_month}(시간)': previous.round(1),
+        f'{last_month}(시간)': current.round(1),
+        '증감(시간)': (current - previous).round(1),
+    })
+    delta = delta.nlargest(top_n, '증감(시간)')
+    return top.reset_index(drop=True), delta.reset_index(drop=True)
+
+def build_overtime_summary(month_df):
+    """한 달치 초과근무 행을 이름·이메일별 초과근무 내역(줄바꿈 연결)과 시간 합계 표로 만드는 함수 (No는 1부터)"""
+    # 초과근무 내용 컬럼명 확인
+    content_column = '초과근무 내용' if '초과근무 내용' in month_df.columns else '초과근무내용'
+    
+    result_df = month_df.groupby(['이름', '이메일']).agg({
+        content_column: lambda x: '\n'.join(x),  # 일반 줄바꿈 문자 사용
+        '초과시간': 'sum'
+    }).reset_index()
+    
+    # 시간을 시:분 형식으로 변환
+    total_hours = result_df['초과시간'].to_numpy(dtype=float)
+    result_df['초과근무시간 합'] = (
+        pd.Series(total_hours.astype(int), index=result_df.index).astype(str) + '시간 '
+        + pd.Series(((total_hours % 1) * 60).astype(int), index=result_df.index).astype(str) + '분'
+    )
+    
+    # 컬럼명 변경
+    result_df = result_df.rename(columns={content_column: '초과근무 내역'})
+    result_df = result_df[['이름', '초과근무시간 합',  '초과근무 내역', '이메일']]
+    
+    # 인덱스를 1부터 시작하도록 설정
+    result_df.index = range(1, len(result_df) + 1)
+    return result_df
+
+def convert_overtime_summary_to_excel(result_df):
+    """초과근무 내역 표를 No 열과 열 너비(이름, 초과근무시간 합, 초과근무 내역, 이메일)를 적용한 엑셀 바이트로 만드는 함수"""
+    return convert_df_to_excel(
+        result_df.rename_axis('No').reset_index(),
+        sheet_name='초과근무내역',
+        column_widths={'B': 10, 'C': 15, 'D': 70, 'E': 25}
+    )
+
+def build_overtime_bundle(month_df, selected_month):
+    """한 달치 초과근무 행을 본부별로 한 번에 나눠 본부마다 초과근무 내역 엑셀을 병렬로 만들고 ZIP 바이트로 묶는 함수"""
+    # 본부가 비어 있는 행도 빠지지 않도록 '미지정'으로 묶음
+    본부_keys = month_df['본부'].astype(object).where(month_df['본부'].notna(), '').astype(str).str.strip().replace('', '미지정')
+
+    # 파일 이름에 쓸 수 없는 경로 구분자는 '_'로 바꾸고, 바꾼 뒤 이름이 겹치면 '_2', '_3'… 을 붙임
+    groups = []
+    used_names = set()
+    for 본부, group in month_df.groupby(본부_keys, sort=True):
+        base_name = 본부.replace('/', '_').replace('\\', '_')
+        name, suffix = base_name, 2
+        while name in used_names:
+            name, suffix = f"{base_name}_{suffix}", suffix + 1
+        used_names.add(name)
+        groups.append((name, group))
+
+    def build_workbook(item):
+        본부, group = item
+        return f"초과근무내역_{selected_month}_{본부}.xlsx", convert_overtime_summary_to_excel(build_overtime_summary(group))
+
+    # 본부별 엑셀 생성은 병렬, ZIP 쓰기는 순차 처리
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(groups)))) as executor:
+        workbooks = list(executor.map(build_workbook, groups))
+
+    output = BytesIO()
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as bundle:
+        for file_name, data in workbooks:
+            bundle.writestr(file_name, data)
+    return output.getvalue()
+
+# 주 52시간 점검 (주 40시간 + 연장근로 12시간)
+OVERTIME_WEEKLY_LIMIT = 12
+# 실제 근무한 날짜 컬럼 (우선순위 순) - 신청일 등 다른 날짜로 점검하지 않도록 이름으로만 찾음
+OVERTIME_DATE_COLUMNS = ['근무일', '근무일자', '초과근무일', '초과근무일자', '일자', '날짜']
+
+def find_overtime_date_column(overtime_df):
+    """초과근무 데이터에서 근무 날짜 컬럼명을 OVERTIME_DATE_COLUMNS 순서로 찾는 함수 - 없으면 None"""
+    for col in OVERTIME_DATE_COLUMNS:
+        if col in overtime_df.columns:
+            return col
+    return None
+
+@st.cache_data(ttl=3600)
+def build_weekly_overtime(_overtime_df, data_version, date_column):
+    """직원·날짜별 초과시간과 그날까지의 최근 7일 합계를 정렬 배열 한 번으로 계산하는 함수
+
+    (직원 코드, 일수)를 하나의 정수 키로 정렬해 누적합을 만들고, 7일 전 위치를 searchsorted로 찾아 구간 합을 뺀다.
+    """
+    dates = pd.to_datetime(_overtime_df[date_column], errors='coerce').dt.normalize()
+    daily = (
+        _overtime_df.assign(날짜=dates)
+        .dropna(subset=['날짜'])
+        .groupby(['이름', '이메일', '날짜'], sort=True)['초과시간'].sum()
+        .reset_index()
+    )
+    employee_codes = daily.groupby(['이름', '이메일'], sort=False).ngroup().to_numpy(dtype='int64')
+    day_numbers = (daily['날짜'].to_numpy(dtype='datetime64[D]') - np.datetime64('1970-01-01', 'D')).astype('int64')
+
+    # groupby 결과는 (이름, 이메일, 날짜) 순으로 정렬되어 있으므로 결합 키도 오름차순
+    combined = employee_codes * 1_000_000 + day_numbers
+    cumulative = np.concatenate([[0.0], np.cumsum(daily['초과시간'].fillna(0).to_numpy(dtype=float))])
+    window_start = np.searchsorted(combined, combined - 6, side='left')
+    daily['7일 합계'] = cumulative[1:] - cumulative[window_start]
+    return daily
+
+def build_compliance_report(weekly_overtime, start_date, end_date, limit=OVERTIME_WEEKLY_LIMIT):
+    """기간 내 최근 7일 초과근무 합계가 limit을 넘은 날을 직원별로 묶은 위반 현황 표를 만드는 함수"""
+    in_period = weekly_overtime['날짜'].between(pd.Timestamp(start_date), pd.Timestamp(end_date))
+    violations = weekly_overtime[in_period & (weekly_overtime['7일 합계'] > limit)]
+    report = violations.groupby(['이름', '이메일'], sort=False).agg(
+        위반일수=('날짜', 'size'),
+        최대_7일합계=('7일 합계', 'max'),
+        최초위반일=('날짜', 'min'),
+        최근위반일=('날짜', 'max'),
+    ).reset_index()
+    report['최대_7일합계'] = report['최대_7일합계'].round(1)
+    report['최초위반일'] = report['최초위반일'].dt.date
+    report['최근위반일'] = report['최근위반일'].dt.date
+    report = report.rename(columns={'최대_7일합계': '최대 7일 합계(시간)'})
+    return report.sort_values(['최대 7일 합계(시간)', '위반일수'], ascending=False).reset_index(drop=True)
+
+def build_overtime_pivot(overtime_rollup, selected_month):
+    """선택 연월의 본부별 초과근무 합계(시간)와 인원수 표를 조직 롤업에서 만드는 함수"""
+    본부_nodes = {
+        path[0]: node.loc[selected_month]
+        for path, node in sorted(overtime_rollup.items())
+        if len(path) == 1 and selected_month in node.index
+    }
+    pivot_df = pd.DataFrame(
+        [{본부: node['초과시간'] for 본부, node in 본부_nodes.items()}],
+        index=pd.Index([selected_month], name='연월구분')
+    )
+    pivot_df.columns.name = '본부'
+
+    # 전체 합계 열 추가
+    pivot_df['전체 합계'] = pivot_df.sum(axis=1)
+
+    # 인원수 행 추가 (전체 합계는 본부별 인원수의 합)
+    employee_count = pd.Series({본부: node['인원수'] for 본부, node in 본부_nodes.items()})
+    employee_count['전체 합계'] = employee_count.sum()
+    pivot_df.loc['인원수'] = employee_count
+    return pivot_df
+
+def format_employment_period(df, query_date):
+    """재직기간을 datetime64 배열 연산으로 계산해 'N년 M개월' 문자열로 반환하는 함수
+
+    퇴직자는 퇴사일, 그 외는 조회일자까지의 일수로 년(365일)/개월(30일)을 계산하며 입사일이 없으면 None
+    """
+    start = pd.to_datetime(df['입사일'], errors='coerce').to_numpy(dtype='datetime64[ns]')
+    exit_ = pd.to_datetime(df['퇴사일'], errors='coerce').to_numpy(dtype='datetime64[ns]')
+    use_exit = (df['재직상태'].to_numpy() == '퇴직') & ~np.isnat(exit_)
+    end = np.where(use_exit, exit_, np.datetime64(pd.Timestamp(query_date), 'ns'))
+
+    valid = ~np.isnat(start)
+    days = (end[valid] - start[valid]) // np.timedelta64(1, 'D')
+    years = days // 365
+    months = (days % 365) // 30
+
+    # 문자열은 (년, 개월) 고유 조합만 만들고 배열 인덱싱으로 배치 - 입사일이 없는 행은 None
+    codes, inverse = np.unique(years * 13 + months, return_inverse=True)
+    labels = np.array([f"{code // 13}년 {code % 13}개월" for code in codes.tolist()], dtype=object)
+    period = np.full(len(df), None, dtype=object)
+    period[valid] = labels[inverse]
+    return pd.Series(period, index=df.index)
+
+# 성명 검색 인덱스 (한글 초성 + 1·2글자 n-gram 포스팅)
+HANGUL_INITIALS = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+
+def get_hangul_initials(text):
+    """한글 음절을 초성으로 바꾼 문자열을 반환하는 함수 (예: '김철수' -> 'ㄱㅊㅅ', 한글이 아닌 문자는 그대로)"""
+    return ''.join(
+        HANGUL_INITIALS[(ord(char) - 0xAC00) // 588] if '가' <= char <= '힣' else char
+        for char in text
+    )
+
+def _build_postings(texts):
+    """문자열 목록의 1글자·2글자 n-gram별로 해당 위치 배열(오름차순)을 만드는 함수"""
+    postings = {}
+    for position, text in enumerate(texts):
+        grams = set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+        for gram in grams:
+            postings.setdefault(gram, []).append(position)
+    return {gram: np.array(positions, dtype=np.int32) for gram, positions in postings.items()}
+
+@st.cache_resource(ttl=3600, max_entries=16)
+def build_name_index(_names, data_version):
+    """성명 Series로 검색 인덱스를 만드는 함수 - data_version(데이터 버전, 데이터 구분)이 바뀔 때만 다시 만든다
+
+    성명과 초성 문자열 각각의 n-gram 포스팅을 갖고, 결과는 원본 Series의 인덱스 라벨로 돌려준다.
+    """
+    names = _names.fillna('').astype(str).str.strip().str.lower().tolist()
+    initials = [get_hangul_initials(name) for name in names]
+    return {
+        'labels': _names.index.to_numpy(),
+        'names': names,
+        'initials': initials,
+        'name_postings': _build_postings(names),
+        'initial_postings': _build_postings(initials),
+    }
+
+def search_name_index(name_index, query):
+    """검색어가 포함된 성명의 인덱스 라벨 배열을 반환하는 함수 - 초성으로만 된 검색어(예: 'ㄱㅊㅅ')는 초성으로 검색"""
+    query = query.strip().lower()
+    if not query:
+        return name_index['labels']
+
+    if all(char in HANGUL_INITIALS for char in query):
+        texts, postings = name_index['initials'], name_index['initial_postings']
+    else:
+        texts, postings = name_index['names'], name_index['name_postings']
+
+    if len(query) == 1:
+        return name_index['labels'][postings.get(query, np.array([], dtype=np.int32))]
+
+    # 검색어의 2글자 조각 포스팅을 짧은 것부터 교집합한 뒤 후보만 부분 문자열 확인
+    grams = sorted({query[i:i + 2] for i in range(len(query) - 1)}, key=lambda gram: len(postings.get(gram, ())))
+    candidates = postings.get(grams[0], np.array([], dtype=np.int32))
+    for gram in grams[1:]:
+        if len(candidates) == 0:
+            break
+        candidates = np.intersect1d(candidates, postings.get(gram, np.array([], dtype=np.int32)), assume_unique=True)
+    if len(query) > 2:
+        candidates = np.array([pos for pos in candidates.tolist() if query in texts[pos]], dtype=np.int32)
+    return name_index['labels'][candidates]
+
+def filter_by_name(df, query, name_index):
+    """검색 인덱스로 찾은 라벨에 해당하는 행만 남기는 함수 - df는 인덱스를 만든 데이터(또는 그 부분집합)"""
+    return df[df.index.isin(search_name_index(name_index, query))]
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file